@@ -0,0 +1,184 @@
+"""World archives
+
+A world archive packs a whole world directory into a single file.
+The file starts with a header, followed by the text of all descriptions,
+one json record per toml file and finally a json index of all records.
+
+The reader maps the file into memory and only parses the records it is asked
+for. Descriptions are replaced by ArchiveText references and only read when
+the entity's description is actually used.
+"""
+
+from __future__ import annotations
+
+import json
+import mmap
+import struct
+from argparse import ArgumentParser
+from pathlib import Path
+from typing import Any, BinaryIO, Iterator, Self
+
+from fantasy_forge.utils import find_world_path, read_toml
+
+MAGIC = b"FFWORLD1"
+HEADER = struct.Struct("<8sQQ")  # magic, index offset, index length
+ARCHIVE_SUFFIX = ".ffw"
+
+
+class ArchiveText:
+    """A reference to a text in a world archive."""
+
+    __slots__ = ("archive", "offset", "length")
+
+    def __init__(self: Self, archive: WorldArchive, offset: int, length: int):
+        self.archive = archive
+        self.offset = offset
+        self.length = length
+
+    def read(self: Self) -> str:
+        return self.archive.read(self.offset, self.length).decode("utf-8")
+
+    def __reduce__(self: Self) -> tuple[type[str], tuple[str]]:
+        # the archive's file and mmap can't be pickled, e.g. for a shard handoff
+        return str, (self.read(),)
+
+
+class WorldArchive:
+    """Reads records from a memory mapped world archive."""
+
+    path: Path
+    world: dict[str, Any]  # contents of world.toml
+    areas: dict[str, list[int]]  # area name -> [offset, length]
+    assets: list[list]  # [parent directory, offset, length]
+    validated: bool  # whether fantasy-forge-compile checked the world
+
+    def __init__(self: Self, path: Path):
+        self.path = path
+        self._file = path.open("rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, index_offset, index_length = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a world archive")
+        index = json.loads(self.read(index_offset, index_length))
+        self.world = index["world"]
+        self.areas = index["areas"]
+        self.assets = index["assets"]
+        self.validated = index.get("validated", False)
+
+    def read(self: Self, offset: int, length: int) -> bytes:
+        return self._mmap[offset : offset + length]
+
+    def record(self: Self, offset: int, length: int) -> dict[str, Any]:
+        """Parses a record, its descriptions stay in the archive."""
+        return self._inflate(json.loads(self.read(offset, length)))
+
+    def area_dict(self: Self, name: str) -> dict[str, Any]:
+        """Returns the dictionary of an area, raises KeyError for unknown areas."""
+        return self.record(*self.areas[name])
+
+    def asset_dicts(self: Self) -> Iterator[tuple[str, dict[str, Any]]]:
+        """Yields parent directory and dictionary of every asset."""
+        for parent, offset, length in self.assets:
+            yield parent, self.record(offset, length)
+
+    def _inflate(self: Self, obj: Any) -> Any:
+        if isinstance(obj, dict):
+            for key, value in obj.items():
+                if key == "description" and isinstance(value, list):
+                    obj[key] = ArchiveText(self, *value)
+                else:
+                    self._inflate(value)
+        elif isinstance(obj, list):
+            for value in obj:
+                self._inflate(value)
+        return obj
+
+    def close(self: Self):
+        self._mmap.close()
+        self._file.close()
+
+
+class _ArchiveWriter:
+    """Writes texts and records, identical texts are only stored once."""
+
+    def __init__(self: Self, stream: BinaryIO):
+        self.stream = stream
+        self.texts: dict[str, list[int]] = {}
+
+    def write(self: Self, data: bytes) -> list[int]:
+        offset = self.stream.tell()
+        self.stream.write(data)
+        return [offset, len(data)]
+
+    def write_record(self: Self, obj: Any) -> list[int]:
+        return self.write(json.dumps(self._extract(obj)).encode("utf-8"))
+
+    def _extract(self: Self, obj: Any) -> Any:
+        """Replaces descriptions by references to their text."""
+        if isinstance(obj, dict):
+            for key, value in obj.items():
+                if key == "description" and isinstance(value, str):
+                    if value not in self.texts:
+                        self.texts[value] = self.write(value.encode("utf-8"))
+                    obj[key] = self.texts[value]
+                else:
+                    self._extract(value)
+        elif isinstance(obj, list):
+            for value in obj:
+                self._extract(value)
+        return obj
+
+
+def pack_world(world_path: Path, archive_path: Path, validated: bool = False) -> None:
+    """Packs a world directory into a world archive.
+
+    validated marks the archive as checked, see fantasy_forge.compiler.
+    """
+    world_toml = read_toml(world_path / "world.toml")
+    areas: dict[str, list[int]] = {}
+    assets: list[list] = []
+    with archive_path.open("wb") as stream:
+        stream.write(HEADER.pack(MAGIC, 0, 0))
+        writer = _ArchiveWriter(stream)
+        for toml_path in sorted(world_path.glob("**/*.toml")):
+            if toml_path == world_path / "world.toml":
+                continue
+            toml_data = read_toml(toml_path)
+            parent = toml_path.parent.name
+            record = writer.write_record(toml_data)
+            assets.append([parent, *record])
+            if parent == "areas":
+                areas[toml_data["name"]] = record
+        index = writer.write(
+            json.dumps(
+                {
+                    "world": world_toml,
+                    "areas": areas,
+                    "assets": assets,
+                    "validated": validated,
+                }
+            ).encode("utf-8")
+        )
+        stream.seek(0)
+        stream.write(HEADER.pack(MAGIC, *index))
+
+
+def parse_args():
+    parser = ArgumentParser(description="Pack a world into a single archive file")
+    parser.add_argument("world", help="Name or path of the world directory")
+    parser.add_argument(
+        "--output", help=f"Archive to write (default: <world>{ARCHIVE_SUFFIX})"
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    world_path = find_world_path(args.world)
+    if args.output is None:
+        archive_path = world_path.with_name(world_path.name + ARCHIVE_SUFFIX)
+    else:
+        archive_path = Path(args.output)
+    pack_world(world_path, archive_path)
+    print(f"Packed {world_path} into {archive_path}")
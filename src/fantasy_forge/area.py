@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import logging
 from pathlib import Path
+from threading import RLock
 from typing import TYPE_CHECKING, Any, Iterator, Self
 
 import toml
@@ -13,12 +14,128 @@ from fantasy_forge.utils import UniqueDict, inflate_contents
 
 logger = logging.getLogger(__name__)
 
+# names of the AreaContents indexes an entity class belongs to
+_kind_indexes: dict[type, tuple[str, ...]] = {}
+
+
+def kind_indexes(cls: type) -> tuple[str, ...]:
+    """Returns the names of the AreaContents indexes for an entity class."""
+    indexes = _kind_indexes.get(cls)
+    if indexes is None:
+        from fantasy_forge.character import Character
+        from fantasy_forge.gateway import Gateway
+        from fantasy_forge.item import Item
+        from fantasy_forge.player import Player
+
+        indexes = tuple(
+            name
+            for name, kind in (
+                ("players", Player),
+                ("characters", Character),
+                ("gateways", Gateway),
+                ("items", Item),
+            )
+            if issubclass(cls, kind)
+        )
+        _kind_indexes[cls] = indexes
+    return indexes
+
+
+class AreaContents(UniqueDict[str, Entity]):
+    """The contents of an area, with secondary indexes by kind.
+
+    Every way of changing the dict keeps the indexes up to date,
+    so they can be used instead of filtering all contents. Changes hold a
+    lock, so players in different threads can't leave the dict and the
+    indexes out of step.
+    The indexes are "players", "characters", "gateways", "items" and "obvious"
+    (entities which are seen when entering the area). An entity's obvious flag
+    is only read when it is added, to change it later pop the entity and add
+    it again.
+    """
+
+    by_kind: dict[str, dict[str, Entity]]
+
+    def __init__(self: Self):
+        super().__init__()
+        self.by_kind = {
+            "players": {},
+            "characters": {},
+            "gateways": {},
+            "items": {},
+            "obvious": {},
+        }
+        self._lock = RLock()
+
+    def __reduce__(self: Self):
+        # rebuild the indexes through __setitem__ when unpickling
+        return (self.__class__, (), None, None, iter(self.items()))
+
+    def _index(self: Self, key: str, entity: Entity):
+        for kind in kind_indexes(type(entity)):
+            self.by_kind[kind][key] = entity
+        if entity.obvious:
+            self.by_kind["obvious"][key] = entity
+
+    def _unindex(self: Self, key: str):
+        for index in self.by_kind.values():
+            index.pop(key, None)
+
+    def __setitem__(self: Self, key: str, entity: Entity):
+        with self._lock:
+            super().__setitem__(key, entity)
+            self._index(key, entity)
+
+    def __delitem__(self: Self, key: str):
+        with self._lock:
+            super().__delitem__(key)
+            self._unindex(key)
+
+    def pop(self: Self, key: str, *default: Any) -> Any:
+        with self._lock:
+            if key not in self:
+                return super().pop(key, *default)
+            entity = super().pop(key)
+            self._unindex(key)
+            return entity
+
+    def popitem(self: Self) -> tuple[str, Entity]:
+        with self._lock:
+            key, entity = super().popitem()
+            self._unindex(key)
+            return key, entity
+
+    def setdefault(self: Self, key: str, default: Entity) -> Entity:
+        with self._lock:
+            if key not in self:
+                self[key] = default
+            return self[key]
+
+    def update(self: Self, *args: Any, **kwargs: Any):
+        with self._lock:
+            for key, entity in dict(*args, **kwargs).items():
+                self[key] = entity
+
+    def __ior__(self: Self, other: Any) -> Self:
+        self.update(other)
+        return self
+
+    def clear(self: Self):
+        with self._lock:
+            super().clear()
+            for index in self.by_kind.values():
+                index.clear()
+
 
 class Area(Entity):
     """An Area is a place in the world, containing NPCs, Items and connections to other areas."""
 
+    __slots__ = ("contents", "source_names")
+
     __important_attributes__ = ("name",)
-    contents: UniqueDict[str, Entity]
+    __attributes__ = {**Entity.__attributes__, "contents": list}
+    contents: AreaContents
+    source_names: frozenset[str]  # of the contents in the area file
 
     def __init__(self: Self, messages: Messages, config_dict: dict[str, Any]):
         """
@@ -30,19 +147,34 @@ class Area(Entity):
         'obvious'(bool): whether the entity will be spotted immediately (default: False)
         """
         super().__init__(messages, config_dict)
-        self.contents = UniqueDict()
+        self.contents = AreaContents()
+        self.source_names = frozenset()
 
     def __iter__(self: Self) -> Iterator:
-        for obj in self.contents:
-            yield obj
+        # a copy, players in other threads might come and go meanwhile
+        yield from list(self.contents)
 
     @property
     def players(self: Self) -> list[Player]:
-        from fantasy_forge.player import Player
+        return list(self.contents.by_kind["players"].values())
 
-        return [
-            player for player in self.contents.values() if isinstance(player, Player)
-        ]
+    @property
+    def characters(self: Self) -> list[Character]:
+        """Returns all characters, including players."""
+        return list(self.contents.by_kind["characters"].values())
+
+    @property
+    def gateways(self: Self) -> list[Gateway]:
+        return list(self.contents.by_kind["gateways"].values())
+
+    @property
+    def items(self: Self) -> list[Item]:
+        return list(self.contents.by_kind["items"].values())
+
+    @property
+    def obvious_entities(self: Self) -> list[Entity]:
+        """Returns the entities which are seen when entering the area."""
+        return list(self.contents.by_kind["obvious"].values())
 
     def on_look(self: Self, actor: Player):
         self.messages.to(
@@ -61,6 +193,7 @@ class Area(Entity):
     def from_dict(messages: Messages, area_dict: dict) -> Area:
         area = Area(messages, area_dict)
         inflate_contents(messages, area_dict.get("contents", []), area)
+        area.source_names = frozenset(area.contents)
         return area
 
     @staticmethod
@@ -83,5 +216,8 @@ class Area(Entity):
 
 
 if TYPE_CHECKING:
+    from fantasy_forge.character import Character
+    from fantasy_forge.gateway import Gateway
+    from fantasy_forge.item import Item
     from fantasy_forge.messages import Messages
     from fantasy_forge.player import Player
@@ -0,0 +1,114 @@
+"""Area actors
+
+An execution model for the threaded server, where every area is an actor:
+everything that touches an area runs in the turn of that area, one task
+after the other. Different areas run in parallel on a thread pool. So two
+players picking up the same item, or a death and a drop in the same area,
+can't get in each other's way, without one lock around the whole world.
+
+Session threads only read input and wait for their commands, see
+AreaActors.run. A command runs in the player's area. When it affects
+another area, like going through a gateway, the rest is posted to the
+other area as a new task, see Player.enter_area. A task never waits for
+another area, so the actors can't deadlock.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import Lock, Thread, current_thread, local
+from typing import Any, Callable, Optional, Self
+
+_task = local()  # the task running in the current thread, see _Mailbox
+
+
+def origin_thread() -> Thread:
+    """Returns the session thread the current code runs for.
+
+    That's the current thread, unless it's a task of an area which was
+    started by a session thread.
+    """
+    return getattr(_task, "origin", None) or current_thread()
+
+
+class _Mailbox:
+    """The tasks of one area, which run one after the other."""
+
+    def __init__(self: Self):
+        # (future, function, arguments, origin thread)
+        self.tasks: deque[tuple[Future, Callable, tuple, Thread]] = deque()
+        self.running = False
+
+
+class AreaActors:
+    """Runs tasks in the turns of areas, which are known by name."""
+
+    _mailboxes: dict[str, _Mailbox]
+
+    def __init__(self: Self, workers: Optional[int] = None):
+        self._pool = ThreadPoolExecutor(workers, thread_name_prefix="area")
+        self._mailboxes = {}
+        self._lock = Lock()
+
+    def submit(self: Self, area_name: str, function: Callable, *args: Any) -> Future:
+        """Queues a task for an area.
+
+        The future's result is the result of the task and the futures of the
+        tasks it posted.
+        """
+        future: Future = Future()
+        with self._lock:
+            mailbox = self._mailboxes.get(area_name)
+            if mailbox is None:
+                mailbox = self._mailboxes[area_name] = _Mailbox()
+            mailbox.tasks.append((future, function, args, origin_thread()))
+            if mailbox.running:
+                return future
+            mailbox.running = True
+        self._pool.submit(self._drain, mailbox)
+        return future
+
+    def post(self: Self, area_name: str, function: Callable, *args: Any):
+        """Queues a task for an area from a task of another area.
+
+        AreaActors.run waits for posted tasks as well.
+        """
+        future = self.submit(area_name, function, *args)
+        posted = getattr(_task, "posted", None)
+        if posted is not None:
+            posted.append(future)
+
+    def run(self: Self, area_name: str, function: Callable, *args: Any) -> Any:
+        """Runs a task in the turn of an area and returns its result.
+
+        This waits until the tasks it posted to other areas are done too.
+        Exceptions of the task are raised here.
+        """
+        result, posted = self.submit(area_name, function, *args).result()
+        while posted:
+            _, more = posted.pop().result()
+            posted.extend(more)
+        return result
+
+    def _drain(self: Self, mailbox: _Mailbox):
+        while True:
+            with self._lock:
+                if not mailbox.tasks:
+                    mailbox.running = False
+                    return
+                future, function, args, origin = mailbox.tasks.popleft()
+            _task.origin = origin
+            _task.posted = posted = []
+            try:
+                result = function(*args)
+            except BaseException as error:
+                future.set_exception(error)
+            else:
+                future.set_result((result, posted))
+            finally:
+                _task.origin = None
+                _task.posted = None
+
+    def shutdown(self: Self):
+        self._pool.shutdown(wait=True)
@@ -0,0 +1,95 @@
+"""Area graph
+
+The area graph knows which gateways lead from which area to which other area.
+It is updated whenever an area is loaded, so in a lazy world it only knows
+the areas which were loaded at least once.
+
+Shortest routes are computed with a breadth-first search per start area and
+cached. Locked gateways are not passable, so the cache is cleared whenever a
+gateway is locked or unlocked.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from threading import Lock
+from typing import TYPE_CHECKING, Optional, Self
+
+from fantasy_forge.gateway import Gateway
+
+
+class AreaGraph:
+    """Gateways between areas and the shortest routes through them."""
+
+    _gateways: dict[str, list[Gateway]]  # area name -> gateways in the area
+    # start area -> reachable area -> (previous area, gateway from there)
+    _routes: dict[str, dict[str, tuple[str, Gateway]]]
+
+    def __init__(self: Self):
+        self._gateways = {}
+        self._routes = {}
+        self._lock = Lock()
+
+    def update(self: Self, area: Area):
+        """Adds an area or replaces its gateways, e.g. after a reload."""
+        gateways = [
+            entity for entity in area.contents.values() if isinstance(entity, Gateway)
+        ]
+        with self._lock:
+            self._gateways[area.name] = gateways
+            self._routes.clear()
+
+    def invalidate(self: Self):
+        """Forgets all cached routes, this is called when a lock changes."""
+        with self._lock:
+            self._routes.clear()
+
+    def __contains__(self: Self, area_name: str) -> bool:
+        return area_name in self._gateways
+
+    def neighbours(self: Self, area_name: str) -> list[str]:
+        """Returns the areas which can be reached through one open gateway."""
+        return [
+            gateway.target_str
+            for gateway in self._gateways.get(area_name, [])
+            if not gateway.locked
+        ]
+
+    def route(self: Self, start: str, goal: str) -> Optional[list[Gateway]]:
+        """Returns the gateways of a shortest route from start to goal.
+
+        The route is empty if start is goal and None if there is no route.
+        """
+        with self._lock:
+            routes = self._routes.get(start)
+            if routes is None:
+                routes = self._search(start)
+                self._routes[start] = routes
+        if goal == start:
+            return []
+        if goal not in routes:
+            return None
+        route: list[Gateway] = []
+        area_name = goal
+        while area_name != start:
+            area_name, gateway = routes[area_name]
+            route.append(gateway)
+        route.reverse()
+        return route
+
+    def _search(self: Self, start: str) -> dict[str, tuple[str, Gateway]]:
+        routes: dict[str, tuple[str, Gateway]] = {}
+        queue = deque([start])
+        while queue:
+            area_name = queue.popleft()
+            for gateway in self._gateways.get(area_name, []):
+                target = gateway.target_str
+                if gateway.locked or target == start or target in routes:
+                    continue
+                routes[target] = (area_name, gateway)
+                queue.append(target)
+        return routes
+
+
+if TYPE_CHECKING:
+    from fantasy_forge.area import Area
@@ -5,6 +5,7 @@ An Armour is an item which can be worn by Characters and grants protection.
 
 from __future__ import annotations
 
+import sys
 from typing import TYPE_CHECKING, Self
 
 from fantasy_forge.item import Item
@@ -20,6 +21,8 @@ ARMOUR_TYPES = ("head", "torso", "legs", "feet")
 class Armour(Item):
     """An Armour object."""
 
+    __slots__ = ("armour_type", "defense")
+
     armour_type: str
     defense: int
 
@@ -44,7 +47,7 @@ class Armour(Item):
         # set armour type
         a_type: str = config_dict.pop("armour_type")
         assert a_type in ARMOUR_TYPES
-        self.armour_type = a_type
+        self.armour_type = sys.intern(a_type)
         self.defense = config_dict.pop("defense")
 
         super().__init__(messages, config_dict)
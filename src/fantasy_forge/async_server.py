@@ -0,0 +1,263 @@
+"""asyncio server
+
+Serves a world with one coroutine per client instead of one thread.
+All sessions run on the event loop thread, the input lines are read with a
+StreamReader and handed to the player's Shell one by one.
+
+The game logic itself is synchronous, so a command blocks the loop while it
+runs. Commands are short, but lazy worlds load areas from disk in between.
+Everything that changes the world runs on the loop, hot reloads as well.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from asyncio import StreamReader, StreamWriter
+from functools import partial
+from typing import Awaitable, Callable, Optional
+
+from fantasy_forge.hot_reload import AreaWatcher
+from fantasy_forge.json_protocol import JsonOutput, handle_request, json_login
+from fantasy_forge.multiplayer import login
+from fantasy_forge.player import Player
+from fantasy_forge.session import REAP_INTERVAL, Session, SessionManager
+from fantasy_forge.world import World
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HIGH_WATER_BYTES = 1 << 20  # unsent bytes before a client counts as slow
+
+
+class StreamOutput:
+    """stdout of a session, writes to a StreamWriter.
+
+    Text is collected until flush, or until the event loop gets to it for
+    messages from other players. So every command and everything that
+    happens at once is sent in a single write. If more than high_water bytes
+    couldn't be sent yet, the output is dropped and on_overflow is called,
+    e.g. to end the session.
+    """
+
+    def __init__(
+        self,
+        writer: StreamWriter,
+        high_water: int = DEFAULT_HIGH_WATER_BYTES,
+        on_overflow: Optional[Callable[[], None]] = None,
+    ):
+        self.writer = writer
+        self.high_water = high_water
+        self.on_overflow = on_overflow
+        self.dropped = 0
+        self._buffer: list[str] = []
+        self._flush_scheduled = False
+
+    def write(self, text: str):
+        self._buffer.append(text)
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            asyncio.get_running_loop().call_soon(self.flush)
+
+    def flush(self):
+        self._flush_scheduled = False
+        if not self._buffer:
+            return
+        text = "".join(self._buffer)
+        self._buffer.clear()
+        if self.writer.is_closing():
+            return
+        if self.writer.transport.get_write_buffer_size() > self.high_water:
+            if not self.dropped:
+                logger.warning("client is too slow, dropping messages")
+                if self.on_overflow is not None:
+                    self.on_overflow()
+            self.dropped += 1
+            return
+        self.dropped = 0
+        self.writer.write(text.encode())
+
+
+async def read_line(reader: StreamReader, session: Session) -> Optional[str]:
+    """Returns the next line without its line break, None on EOF."""
+    try:
+        line = await reader.readline()
+    except (ConnectionError, ValueError):
+        # ValueError: the line is longer than the reader's limit
+        return None
+    session.touch()
+    if not line:
+        return None
+    return line.decode(errors="replace").rstrip("\r\n")
+
+
+async def play_text(
+    world: World, session: Session, reader: StreamReader, output: StreamOutput
+):
+    """Runs the login and the game of a client of the text protocol."""
+    dialogue = login(world)
+    text = next(dialogue)
+    while True:
+        output.write(text)
+        output.flush()
+        line = await read_line(reader, session)
+        if line is None:
+            dialogue.close()
+            return
+        try:
+            text = dialogue.send(line)
+        except StopIteration as done:
+            player_name, player_desc, locale = done.value
+            break
+
+    print(f"new connection from {player_name} @ {session.address}")
+    world.messages.to(world.players, "player-join", player_name=player_name)
+    player = Player(world, player_name, player_desc, session, locale=locale)
+    session.player = player
+    player.enter_game(stdin=reader, stdout=output)
+    shell = player.shell
+    stop = False
+    try:
+        while not stop:
+            output.write(shell.prompt)
+            output.flush()
+            line = await read_line(reader, session)
+            try:
+                stop = shell.handle_line("EOF" if line is None else line)
+            except Exception:
+                # one broken command shouldn't end the session
+                logger.exception("command of %s failed: %r", player_name, line)
+                stop = line is None
+    finally:
+        player.leave_game()
+        print(f"closed connection from {player_name} @ {session.address}")
+        world.messages.to(world.players, "player-quit", player_name=player_name)
+
+
+async def play_json(
+    world: World, session: Session, reader: StreamReader, output: StreamOutput
+):
+    """Runs the login and the game of a client of the JSON protocol."""
+    json_output = JsonOutput(output)
+    dialogue = json_login(world)
+    reply = next(dialogue)
+    while True:
+        json_output.send(reply)
+        json_output.flush()
+        line = await read_line(reader, session)
+        if line is None:
+            return
+        try:
+            reply = dialogue.send(line)
+        except StopIteration as done:
+            player_name, player_desc, locale, request_id = done.value
+            break
+
+    print(f"new json connection from {player_name} @ {session.address}")
+    world.messages.to(world.players, "player-join", player_name=player_name)
+    player = Player(world, player_name, player_desc, session, locale=locale)
+    session.player = player
+    json_output.begin(request_id)
+    player.enter_game(stdin=reader, stdout=json_output)
+    json_output.end(stop=False)
+    shell = player.shell
+    stop = False
+    try:
+        while not stop:
+            line = await read_line(reader, session)
+            try:
+                if line is None:
+                    stop = shell.handle_line("EOF")
+                else:
+                    stop = handle_request(shell, json_output, line)
+            except Exception:
+                # one broken command shouldn't end the session
+                logger.exception("command of %s failed: %r", player_name, line)
+                stop = line is None
+    finally:
+        player.leave_game()
+        print(f"closed json connection from {player_name} @ {session.address}")
+        world.messages.to(world.players, "player-quit", player_name=player_name)
+
+
+async def run_session(
+    world: World,
+    sessions: SessionManager,
+    reader: StreamReader,
+    writer: StreamWriter,
+    high_water: int = DEFAULT_HIGH_WATER_BYTES,
+    disconnect_slow: bool = False,
+    play: Callable[..., Awaitable[None]] = play_text,
+):
+    """Runs a session of one client, play is play_text or play_json."""
+    peer = writer.get_extra_info("peername")
+    # feeding EOF ends the pending read, the client still gets the last output
+    session = sessions.open(peer[0], reader.feed_eof)
+    output = StreamOutput(
+        writer,
+        high_water,
+        partial(session.stop, "too slow") if disconnect_slow else None,
+    )
+    try:
+        await play(world, session, reader, output)
+    finally:
+        sessions.close(session)
+        output.flush()
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+async def reap_idle(sessions: SessionManager):
+    while True:
+        await asyncio.sleep(REAP_INTERVAL)
+        sessions.reap()
+
+
+async def watch_areas(watcher: AreaWatcher):
+    """Polls for changed area files on the loop instead of in a thread."""
+    while True:
+        await asyncio.sleep(watcher.interval)
+        watcher.poll()
+
+
+async def serve(
+    world: World,
+    host: str,
+    port: int,
+    high_water: int = DEFAULT_HIGH_WATER_BYTES,
+    disconnect_slow: bool = False,
+    idle_timeout: Optional[float] = None,
+    json_port: Optional[int] = None,
+    watcher: Optional[AreaWatcher] = None,
+):
+    """Serves the world until the task is cancelled.
+
+    If json_port is set, the JSON protocol is served there as well.
+    The watcher isn't started as a thread, it is polled on the loop.
+    """
+    sessions = SessionManager(idle_timeout)
+
+    async def handle(reader: StreamReader, writer: StreamWriter):
+        await run_session(world, sessions, reader, writer, high_water, disconnect_slow)
+
+    async def handle_json(reader: StreamReader, writer: StreamWriter):
+        await run_session(
+            world, sessions, reader, writer, high_water, disconnect_slow, play_json
+        )
+
+    servers = [await asyncio.start_server(handle, host, port)]
+    if json_port is not None:
+        servers.append(await asyncio.start_server(handle_json, host, json_port))
+    tasks = [asyncio.create_task(reap_idle(sessions))]
+    if watcher is not None:
+        tasks.append(asyncio.create_task(watch_areas(watcher)))
+    try:
+        await asyncio.gather(*(server.serve_forever() for server in servers))
+    finally:
+        for server in servers:
+            server.close()
+        for task in tasks:
+            task.cancel()
+        sessions.stop_all()
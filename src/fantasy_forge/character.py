@@ -5,6 +5,7 @@ A character is a living entity, which can interact with other entities or charac
 
 from __future__ import annotations
 
+from functools import cache
 from typing import TYPE_CHECKING, Any, Self
 
 from fantasy_forge.entity import Entity
@@ -16,7 +17,9 @@ BASE_INVENTORY_CAPACITY = 10
 BASE_DAMAGE = 1
 
 
+@cache
 def bare_hands(messages: Messages):
+    # the weapon is never put anywhere, so all unarmed attacks can share it
     return Weapon(
         messages,
         {
@@ -30,6 +33,8 @@ def bare_hands(messages: Messages):
 class Character(Entity):
     """A character in the world."""
 
+    __slots__ = ("health", "inventory", "main_hand", "_alive")
+
     __important_attributes__ = ("name", "health", "alive")
     __attributes__ = {**Entity.__attributes__, "health": int, "alive": bool}
 
@@ -78,12 +83,18 @@ class Character(Entity):
         """Handles an incoming attack."""
         self.health -= weapon.damage
 
-    def _on_death(self: Self, player: Player):
+    def _on_death(self: Self, player: Player) -> bool:
         """
         Automatic on death call.
+
+        Returns False if another player killed it at the same time.
         """
         assert self is not player
         assert not self.alive, "On_death called while entity is alive"
+        # remove it from the area first, if several players killed it at once
+        # only one of them gets the loot
+        if player.area.contents.pop(self.name, None) is None:
+            return False
         self.messages.to(
             [player],
             "attack-character-dead-message",
@@ -98,6 +109,7 @@ class Character(Entity):
         )
         for loot_item in self.inventory.pop_all():
             player.area.contents[loot_item.name] = loot_item
+            player.world.key_registry.move(loot_item, player.area)
             player.seen_entities[loot_item.name] = loot_item
 
             self.messages.to(
@@ -105,9 +117,8 @@ class Character(Entity):
                 "attack-drop-single",
                 item=loot_item.name,
             )
-        # if the target is dead, remove it from the area
-        del player.area.contents[self.name]
-        del player.seen_entities[self.name]
+        player.seen_entities.pop(self.name, None)
+        return True
 
 
 if TYPE_CHECKING:
@@ -0,0 +1,289 @@
+"""World compiler
+
+fantasy-forge-compile validates a world directory in one pass and packs it
+into a world archive, which is marked as validated. The runtime then skips
+the checks in Gateway.resolve.
+
+Checked are:
+- the attributes of every asset against the __attributes__ of its class
+- prototypes and the references to them
+- whether every asset can be created at all
+- gateway targets and the keys of locked gateways
+- which areas can be reached from the spawn
+- whether every locked gateway can be unlocked with the keys that can be reached
+"""
+
+from __future__ import annotations
+
+import copy
+import sys
+from argparse import ArgumentParser
+from importlib import resources
+from pathlib import Path
+from typing import Any, Self
+
+from fantasy_forge.archive import ARCHIVE_SUFFIX, pack_world
+from fantasy_forge.area import Area
+from fantasy_forge.armour import Armour
+from fantasy_forge.container import Container
+from fantasy_forge.enemy import Enemy
+from fantasy_forge.entity import Entity
+from fantasy_forge.gateway import Gateway
+from fantasy_forge.item import Item
+from fantasy_forge.key import Key, KeyRegistry, nested_contents
+from fantasy_forge.localization import get_fluent_locale
+from fantasy_forge.messages import Messages
+from fantasy_forge.prototype import PrototypeRegistry
+from fantasy_forge.utils import find_world_path, read_toml
+from fantasy_forge.weapon import Weapon
+from fantasy_forge.world import ASSET_TYPES
+
+WORLD_ATTRIBUTES: dict[str, type] = {
+    "name": str,
+    "language": str,
+    "spawn": str,
+    "intro_text": str,
+    "areas": list,
+    "prototypes": dict,
+}
+
+# see utils.inflate_entity
+ENTITY_KINDS: dict[str, type] = {
+    "entity": Entity,
+    "item": Item,
+    "gateway": Gateway,
+    "key": Key,
+    "enemy": Enemy,
+    "weapon": Weapon,
+    "armour": Armour,
+    "container": Container,
+}
+
+
+class Report:
+    """Collects the problems found in a world."""
+
+    errors: list[str]  # the world can't be compiled
+    warnings: list[str]  # the world works, but probably not as intended
+
+    def __init__(self: Self):
+        self.errors = []
+        self.warnings = []
+
+    def error(self: Self, where: str, message: str):
+        self.errors.append(f"{where}: {message}")
+
+    def warning(self: Self, where: str, message: str):
+        self.warnings.append(f"{where}: {message}")
+
+    def __bool__(self: Self) -> bool:
+        """Returns True if there are no errors."""
+        return not self.errors
+
+
+def check_attributes(
+    report: Report, where: str, attributes: dict[str, type], data: dict[str, Any]
+):
+    """Checks names and types of the attributes in data."""
+    for key, value in data.items():
+        if key == "kind":
+            continue
+        expected = attributes.get(key)
+        if expected is None:
+            report.warning(where, f"unknown attribute {key!r}")
+        elif not isinstance(value, expected):
+            report.error(
+                where,
+                f"{key!r} should be {expected.__name__}, not {type(value).__name__}",
+            )
+
+
+def check_schema(report: Report, where: str, asset_type: type, data: dict[str, Any]):
+    """Checks an asset and all of its contents and loot."""
+    check_attributes(report, where, asset_type.__attributes__, data)
+    for field, default_kind in (("contents", "entity"), ("loot", "item")):
+        children = data.get(field, [])
+        if not isinstance(children, list):
+            continue
+        names: set[str] = set()
+        for index, child in enumerate(children):
+            child_where = f"{where} > {child.get('name', f'{field}[{index}]')}"
+            kind = child.get("kind", default_kind)
+            if kind not in ENTITY_KINDS:
+                report.error(child_where, f"unknown kind {kind!r}")
+                continue
+            if "name" not in child:
+                report.error(child_where, "missing 'name'")
+            elif child["name"] in names:
+                report.error(child_where, "name is used twice")
+            else:
+                names.add(child["name"])
+            check_schema(report, child_where, ENTITY_KINDS[kind], child)
+
+
+def explore(
+    areas: dict[str, Area], spawn: str, ignore_locks: bool
+) -> tuple[set[str], list[tuple[Area, Gateway]]]:
+    """Walks the world from the spawn, collecting every key on the way.
+
+    Returns the reachable areas and the locked gateways that couldn't be opened.
+    """
+    visited: set[str] = set()
+    key_ids: set[str] = set()
+    queue: list[str] = [spawn]
+    blocked: list[tuple[Area, Gateway]] = []
+    while queue:
+        name = queue.pop()
+        if name in visited or name not in areas:
+            continue
+        visited.add(name)
+        area = areas[name]
+        for entity, _ in nested_contents(area):
+            if isinstance(entity, Key):
+                key_ids.add(entity.key_id)
+            if isinstance(entity, Gateway):
+                blocked.append((area, entity))
+        # new keys might open gateways of areas we visited before
+        still_blocked: list[tuple[Area, Gateway]] = []
+        for source, gateway in blocked:
+            passable = not gateway.locked or key_ids & set(gateway.key_list)
+            if ignore_locks or passable:
+                queue.append(gateway.target_str)
+            else:
+                still_blocked.append((source, gateway))
+        blocked = still_blocked
+    return visited, blocked
+
+
+def validate_world(world_path: Path) -> Report:
+    """Checks a world directory, see the module docstring."""
+    report = Report()
+    try:
+        world_toml = read_toml(world_path / "world.toml")
+    except Exception as error:
+        report.error("world.toml", str(error))
+        return report
+    check_attributes(report, "world.toml", WORLD_ATTRIBUTES, world_toml)
+    for key in ("name", "language", "spawn", "intro_text"):
+        if key not in world_toml:
+            report.error("world.toml", f"missing {key!r}")
+
+    with resources.as_file(resources.files()) as resource_path:
+        locale_path = resource_path / "l10n/{locale}"
+    messages = Messages(get_fluent_locale(locale_path))
+
+    # prototypes
+    try:
+        prototypes = PrototypeRegistry(world_toml.get("prototypes"))
+    except (KeyError, ValueError) as error:
+        report.error("world.toml", f"prototypes: {error.args[0]}")
+        prototypes = PrototypeRegistry()
+    for name in world_toml.get("prototypes", {}):
+        if name not in prototypes:
+            continue
+        where = f"world.toml > prototypes > {name}"
+        try:
+            prototype = prototypes.instantiate(name)
+        except KeyError as error:
+            report.error(where, error.args[0])
+            continue
+        kind = prototype.get("kind", "entity")
+        if kind not in ENTITY_KINDS:
+            report.error(where, f"unknown kind {kind!r}")
+            continue
+        check_schema(report, where, ENTITY_KINDS[kind], {"name": name, **prototype})
+
+    # schemas and assets
+    areas: dict[str, Area] = {}
+    for toml_path in sorted(world_path.glob("**/*.toml")):
+        where = toml_path.relative_to(world_path).as_posix()
+        if where == "world.toml":
+            continue
+        asset_type = ASSET_TYPES.get(toml_path.parent.name)
+        if asset_type is None or not hasattr(asset_type, "from_dict"):
+            report.warning(where, "not an asset directory, skipped")
+            continue
+        try:
+            toml_data = read_toml(toml_path)
+        except Exception as error:
+            report.error(where, str(error))
+            continue
+        try:
+            prototypes.expand(toml_data)
+        except KeyError as error:
+            report.error(where, error.args[0])
+            continue
+        check_schema(report, where, asset_type, toml_data)
+        try:
+            asset = asset_type.from_dict(messages, copy.deepcopy(toml_data))
+        except Exception as error:
+            report.error(where, f"{type(error).__name__}: {error}")
+            continue
+        if isinstance(asset, Area):
+            if asset.name in areas:
+                report.error(where, f"area {asset.name!r} is defined twice")
+            areas[asset.name] = asset
+
+    # gateways and keys
+    key_registry = KeyRegistry()
+    for area in areas.values():
+        key_registry.add_contents(area)
+    for area in areas.values():
+        for entity, _ in nested_contents(area):
+            if not isinstance(entity, Gateway):
+                continue
+            where = f"{area.name} > {entity.name}"
+            if entity.target_str not in areas:
+                report.error(where, f"unknown target area {entity.target_str!r}")
+            if entity.locked and not entity.key_list:
+                report.error(where, "locked, but there is no key_list")
+            for key_id in entity.key_list:
+                if key_id not in key_registry:
+                    report.error(where, f"there is no key {key_id!r}")
+
+    # reachability
+    spawn = world_toml.get("spawn")
+    if spawn not in areas:
+        report.error("world.toml", f"unknown spawn area {spawn!r}")
+        return report
+    reachable, _ = explore(areas, spawn, ignore_locks=True)
+    for name in areas.keys() - reachable:
+        report.warning(name, "can't be reached from the spawn")
+    solvable, blocked = explore(areas, spawn, ignore_locks=False)
+    for source, gateway in blocked:
+        report.error(
+            f"{source.name} > {gateway.name}",
+            "locked and none of its keys can be reached",
+        )
+    for name in reachable - solvable:
+        report.error(name, "can only be reached through locked gateways")
+    return report
+
+
+def parse_args():
+    parser = ArgumentParser(description="Validate and compile a world")
+    parser.add_argument("world", help="Name or path of the world directory")
+    parser.add_argument(
+        "--output", help=f"Archive to write (default: <world>{ARCHIVE_SUFFIX})"
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    world_path = find_world_path(args.world)
+    report = validate_world(world_path)
+    for warning in report.warnings:
+        print(f"warning: {warning}")
+    for error in report.errors:
+        print(f"error: {error}")
+    if not report:
+        print(f"{world_path} has {len(report.errors)} errors, nothing written")
+        sys.exit(1)
+
+    if args.output is None:
+        archive_path = world_path.with_name(world_path.name + ARCHIVE_SUFFIX)
+    else:
+        archive_path = Path(args.output)
+    pack_world(world_path, archive_path, validated=True)
+    print(f"Compiled {world_path} into {archive_path}")
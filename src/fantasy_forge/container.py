@@ -16,10 +16,13 @@ from fantasy_forge.utils import UniqueDict, inflate_contents
 class Container(Item):
     """Container object."""
 
+    __slots__ = ("contents", "capacity", "content_weight")
+
     contents: UniqueDict[str, Item]
     capacity: int
+    content_weight: int  # running sum of the weight of all contents
     __important_attributes__ = (*Item.__important_attributes__, "capacity")
-    __attributes__ = {**Item.__attributes__, "capacity": int}
+    __attributes__ = {**Item.__attributes__, "capacity": int, "contents": list}
 
     def __init__(self: Self, messages: Messages, config_dict: dict[str, Any]) -> None:
         """
@@ -40,6 +43,23 @@ class Container(Item):
         self.capacity = config_dict.get("capacity", 10)
         self.contents = UniqueDict()
         inflate_contents(messages, config_dict.get("contents", []), self)
+        self.content_weight = self.calculate_weight()
+
+    def calculate_weight(self: Self) -> int:
+        """Sums up the weight of all contents, see content_weight."""
+        weight = 0
+        for item in self.contents.values():
+            weight += getattr(item, "weight", 0)
+        return weight
+
+    def check_weight(self: Self):
+        """Checks content_weight against the actual contents, for debugging."""
+        actual = self.calculate_weight()
+        if actual != self.content_weight:
+            raise AssertionError(
+                f"{self!r} has content_weight {self.content_weight}, "
+                f"but its contents weigh {actual}"
+            )
 
     def __len__(self: Self) -> int:
         """Returns current capacity."""
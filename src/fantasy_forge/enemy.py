@@ -5,16 +5,21 @@ An enemy is a hostile character which will attack the player on contact.
 
 from typing import TYPE_CHECKING, Any, Self
 from fantasy_forge.character import Character, bare_hands
-from fantasy_forge.item import Item
 from fantasy_forge.messages import Messages
+from fantasy_forge.utils import inflate_entity
 
 
 class Enemy(Character):
     """An enemy is a person which will fight back."""
+
+    __slots__ = ()
+
+    __attributes__ = {**Character.__attributes__, "loot": list}
+
     def __init__(self: Self, messages: Messages, config_dict: dict[str, Any]):
         """
         config_dict contents
-        'loot' (list[Item]): items dropped after death
+        'loot' (list[dict]): items dropped after death, 'kind' defaults to "item"
 
         inherited from Character
         'health' (int): health points
@@ -26,7 +31,9 @@ class Enemy(Character):
         """
         super().__init__(messages, config_dict)
         for item_dict in config_dict.get("loot", []):
-            self.inventory.add(Item(messages, item_dict))
+            self.inventory.add(
+                inflate_entity(messages, item_dict, default_kind="item")
+            )
 
     def __str__(self: Self) -> str:
         return self.name
@@ -6,18 +6,20 @@ Each entity is identifiable by its name.
 
 from __future__ import annotations
 
+import sys
 from typing import TYPE_CHECKING, Any, Self
 
-
 class Entity:
     """An Entity object"""
 
+    __slots__ = ("messages", "name", "_description", "obvious")
+
     __important_attributes__ = ("name",)
     __attributes__: dict[str, type] = {"name": str, "description": str, "obvious": bool}
 
     messages: Messages
     name: str
-    description: str
+    _description: str | ArchiveText
     obvious: bool  # obvious entities are seen when entering the room
     l10n: FluentLocalization
 
@@ -33,10 +35,30 @@ class Entity:
         'obvious'(bool): whether the entity will be spotted immediately (default: False)
         """
         self.messages = messages
-        self.name = config_dict.pop("name")
-        self.description = config_dict.pop("description", "")
+        self.name = sys.intern(config_dict.pop("name"))
+        description = config_dict.pop("description", "")
+        if isinstance(description, str):
+            # identical descriptions share one string object, interned strings
+            # are freed again when no entity uses them, e.g. when a player left
+            description = sys.intern(description)
+        self.description = description
         self.obvious = config_dict.pop("obvious", False)
-        
+
+    @property
+    def description(self: Self) -> str:
+        """Description of the entity.
+
+        Entities from a world archive only read it from the archive when needed.
+        """
+        description = self._description
+        if isinstance(description, str):
+            return description
+        return description.read()
+
+    @description.setter
+    def description(self: Self, description: str | ArchiveText):
+        self._description = description
+
     def on_look(self: Self, actor: Player):
         actor.shell.stdout.write(self.description + "\n")
 
@@ -71,6 +93,7 @@ class Entity:
 
 
 if TYPE_CHECKING:
+    from fantasy_forge.archive import ArchiveText
     from fantasy_forge.messages import Messages
     from fantasy_forge.player import Player
     from fantasy_forge.world import World
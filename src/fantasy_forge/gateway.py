@@ -5,6 +5,8 @@ A gateway connects two areas.
 
 from __future__ import annotations
 
+import sys
+from threading import Lock
 from typing import TYPE_CHECKING, Any, Optional, Self
 
 from fantasy_forge.area import Area
@@ -12,10 +14,16 @@ from fantasy_forge.entity import Entity
 from fantasy_forge.key import Key
 from fantasy_forge.messages import Messages
 
+# locking and unlocking is rare, so all gateways share one lock
+_lock_state = Lock()
+
+
 class Gateway(Entity):
     """A Gateway is a one-way connection to an area."""
 
-    __important_attributes__ = ("name", "target", "locked")
+    __slots__ = ("target_str", "world", "locked", "key_list")
+
+    __important_attributes__ = ("name", "target_str", "locked")
     __attributes__ = {
         **Entity.__attributes__,
         "target": str,
@@ -24,7 +32,7 @@ class Gateway(Entity):
     }
 
     target_str: str  # This is not an area because the target might not be loaded yet.
-    target: Optional[Area]
+    world: Optional[World]
     locked: bool
     key_list: list[str]
 
@@ -44,13 +52,27 @@ class Gateway(Entity):
         'description' (str): description of the entity (default: "")
         'obvious'(bool): whether the entity will be spotted immediately (default: False)
         """
-        self.target_str = config_dict.pop("target")
-        self.target = None
+        self.target_str = sys.intern(config_dict.pop("target"))
+        self.world = None
         self.locked = config_dict.pop("locked", False)
-        self.key_list = config_dict.pop("key_list", [])
+        self.key_list = [sys.intern(key) for key in config_dict.pop("key_list", [])]
         super().__init__(messages, config_dict)
         
+    @property
+    def target(self: Self) -> Optional[Area]:
+        """The target area, in a lazy world it is loaded on first access."""
+        if self.world is None:
+            return None
+        return self.world.get_area(self.target_str)
+
     def on_look(self: Self, actor: Player):
+        # looking at a gateway is a good hint that the player wants to use it,
+        # so a lazy world loads the target now, unless another shard serves it
+        world = self.world
+        if world is not None and (
+            world.shard is None or world.shard.owns(self.target_str)
+        ):
+            world.get_area(self.target_str)
         if self.key_list and self.locked:
             self.messages.to([actor], "gateway-on-look-locked")
         actor.shell.stdout.write(self.description + "\n")
@@ -72,15 +94,18 @@ class Gateway(Entity):
                 name=self.name,
             )
             return
-        if self.locked:
-            self.on_unlock(actor, other)
-        else:
-            self.on_lock(actor, other)
+        # two players using keys at once toggle the gateway one after the other
+        with _lock_state:
+            if self.locked:
+                self.on_unlock(actor, other)
+            else:
+                self.on_lock(actor, other)
 
     def on_unlock(self: Self, actor: Player, key: Key):
         if key.key_id in self.key_list:
             self.locked = False
             key.used = True
+            self._lock_changed()
             self.messages.to(
                 [actor],
                 "gateway-unlock-message",
@@ -91,12 +116,28 @@ class Gateway(Entity):
         if key.key_id in self.key_list:
             self.locked = True
             key.used = True
+            self._lock_changed()
             self.messages.to(
                 [actor],
                 "gateway-lock-message",
                 name=self.name,
             )
 
+    def _lock_changed(self: Self):
+        # routes through this gateway might have opened or closed
+        if self.world is not None:
+            self.world.area_graph.invalidate()
+
+    def __getstate__(self: Self) -> tuple[None, dict[str, Any]]:
+        """Pickles the gateway without its world.
+
+        The target is looked up by name, so pickling an area doesn't recurse
+        through the whole gateway graph.
+        """
+        # slotted objects are pickled as (None, slots)
+        _, slots = super().__getstate__()
+        return None, {**slots, "world": None}
+
     def to_dict(self: Self) -> dict:
         """Returns gateway as a dictionary."""
         gateway_dict: dict = super().to_dict()
@@ -104,17 +145,15 @@ class Gateway(Entity):
         return gateway_dict
 
     def resolve(self, world: World):
-        self.target = world.areas[self.target_str]
+        self.world = world
+        if world.lazy or world.validated:
+            # the other areas aren't loaded yet or the compiler checked them already
+            return
+        world.get_area(self.target_str)
         if self.locked:
             assert self.key_list
-            all_keys = []
-            for area in world.areas.values():
-                for entity in area.contents.values():
-                    if isinstance(entity, Key):
-                        all_keys.append(entity.key_id)
-
             for key in self.key_list:
-                assert key in all_keys
+                assert key in world.key_registry
 
 
 if TYPE_CHECKING:
@@ -0,0 +1,261 @@
+"""World generator
+
+fantasy-forge-generate creates large synthetic worlds for scale testing.
+The worlds are written as toml files in the usual layout and only depend on
+the seed and the options, so runs are reproducible.
+
+Every area can be reached from the spawn: each area gets a gateway from an
+earlier area. Locked gateways only ever lead to later areas and their key is
+placed in an earlier area, so every world can be solved.
+"""
+
+from __future__ import annotations
+
+import random
+import sys
+from argparse import ArgumentParser
+from pathlib import Path
+from typing import Any, Self
+
+import toml
+
+from fantasy_forge.armour import ARMOUR_TYPES
+from fantasy_forge.utils import WORLDS_FOLDER
+
+ADJECTIVES = ("dusty", "damp", "bright", "quiet", "cold", "narrow", "vast", "old")
+PLACES = ("hall", "cellar", "corridor", "chamber", "workshop", "library", "vault")
+THINGS = ("lamp", "rug", "barrel", "painting", "bench", "crate", "statue", "mirror")
+ENEMIES = ("goblin", "rat", "skeleton", "slime", "bandit")
+WEAPONS = ("sword", "axe", "dagger", "club", "spear")
+ARMOUR = {"head": "helmet", "torso": "chainmail", "legs": "greaves", "feet": "boots"}
+
+
+class WorldGenerator:
+    """Generates the toml data of a world."""
+
+    rng: random.Random
+    area_count: int
+    fan_out: int  # gateways per area
+    locked_ratio: float  # share of gateways which are locked
+    entities: int  # entities per area, not counting gateways
+    areas: list[dict[str, Any]]
+    links: list[set[int]]  # targets of the gateways of every area
+
+    def __init__(
+        self: Self,
+        seed: int,
+        area_count: int,
+        fan_out: int = 3,
+        locked_ratio: float = 0.2,
+        entities: int = 8,
+    ):
+        self.rng = random.Random(seed)
+        self.area_count = area_count
+        self.fan_out = fan_out
+        self.locked_ratio = locked_ratio
+        self.entities = entities
+        self.areas = []
+        self.links = []
+
+    @staticmethod
+    def area_name(index: int) -> str:
+        return f"area {index}"
+
+    def description(self: Self, noun: str) -> str:
+        # descriptions repeat a lot, like in hand written worlds
+        return f"a {self.rng.choice(ADJECTIVES)} {noun}"
+
+    def generate(self: Self) -> list[dict[str, Any]]:
+        for index in range(self.area_count):
+            self.areas.append(
+                {
+                    "name": self.area_name(index),
+                    "description": self.description(self.rng.choice(PLACES)),
+                    "contents": [],
+                }
+            )
+            self.links.append(set())
+        # entities first, so that keys can be hidden in containers and loot
+        for index in range(self.area_count):
+            self.add_entities(index)
+        for index in range(self.area_count):
+            self.add_gateways(index)
+        return self.areas
+
+    def add_gateway(self: Self, source: int, target: int, locked: bool):
+        if target in self.links[source]:
+            return
+        self.links[source].add(target)
+        gateway: dict[str, Any] = {
+            "kind": "gateway",
+            "name": f"door to {self.area_name(target)}",
+            "description": self.description("door"),
+            "target": self.area_name(target),
+            "obvious": True,
+        }
+        if locked:
+            key_id = f"key {source} {target}"
+            gateway["locked"] = True
+            gateway["key_list"] = [key_id]
+            # the key lies in an earlier area, so it can be reached without this gateway
+            self.place(
+                self.rng.randrange(target),
+                {
+                    "kind": "key",
+                    "name": f"key for {self.area_name(target)} from {source}",
+                    "description": self.description("key"),
+                    "key_id": key_id,
+                },
+            )
+        self.areas[source]["contents"].append(gateway)
+
+    def add_gateways(self: Self, index: int):
+        if index > 0:
+            # connect every area to an earlier one, so all of them are reachable
+            parent = self.rng.randrange(index)
+            self.add_gateway(parent, index, self.rng.random() < self.locked_ratio)
+            self.add_gateway(index, parent, False)
+        candidates = self.rng.sample(
+            range(self.area_count), min(self.fan_out + 1, self.area_count)
+        )
+        for target in candidates:
+            if len(self.links[index]) >= self.fan_out:
+                break
+            if target == index:
+                continue
+            # locked gateways only lead to later areas, see the module docstring
+            locked = target > index and self.rng.random() < self.locked_ratio
+            self.add_gateway(index, target, locked)
+
+    def place(self: Self, index: int, entity: dict[str, Any]):
+        """Puts an entity into an area, sometimes hidden in a container or loot."""
+        contents = self.areas[index]["contents"]
+        holders = [
+            content
+            for content in contents
+            if content.get("kind") in ("container", "enemy")
+        ]
+        if holders and self.rng.random() < 0.5:
+            holder = self.rng.choice(holders)
+            if holder["kind"] == "container":
+                holder["contents"].append(entity)
+            else:
+                holder["loot"].append(entity)
+        else:
+            contents.append(entity)
+
+    def add_entities(self: Self, index: int):
+        contents = self.areas[index]["contents"]
+        for number in range(self.entities):
+            match self.rng.randrange(6):
+                case 0:
+                    contents.append(
+                        {
+                            "kind": "container",
+                            "name": f"chest {number}",
+                            "description": self.description("chest"),
+                            "carryable": False,
+                            "capacity": 10,
+                            "contents": [self.item(f"coin {number}")],
+                        }
+                    )
+                case 1:
+                    contents.append(
+                        {
+                            "kind": "enemy",
+                            "name": f"{self.rng.choice(ENEMIES)} {number}",
+                            "description": self.description("monster"),
+                            "health": self.rng.randint(5, 50),
+                            "obvious": True,
+                            "loot": [
+                                self.item(f"trophy {number}"),
+                                self.weapon(number),
+                            ],
+                        }
+                    )
+                case 2:
+                    contents.append(self.weapon(number))
+                case 3:
+                    armour_type = self.rng.choice(ARMOUR_TYPES)
+                    contents.append(
+                        {
+                            "kind": "armour",
+                            "name": f"{ARMOUR[armour_type]} {number}",
+                            "description": self.description(ARMOUR[armour_type]),
+                            "armour_type": armour_type,
+                            "defense": self.rng.randint(1, 10),
+                        }
+                    )
+                case 4:
+                    contents.append(self.item(f"{self.rng.choice(THINGS)} {number}"))
+                case _:
+                    contents.append(
+                        {
+                            "name": f"{self.rng.choice(THINGS)} {number}",
+                            "description": self.description("thing"),
+                        }
+                    )
+
+    def item(self: Self, name: str) -> dict[str, Any]:
+        return {
+            "kind": "item",
+            "name": name,
+            "description": self.description("item"),
+            "weight": self.rng.randint(1, 3),
+        }
+
+    def weapon(self: Self, number: int) -> dict[str, Any]:
+        weapon = self.rng.choice(WEAPONS)
+        return {
+            "kind": "weapon",
+            "name": f"{weapon} {number}",
+            "description": self.description(weapon),
+            "damage": self.rng.randint(2, 20),
+        }
+
+
+def write_world(world_path: Path, name: str, areas: list[dict[str, Any]]):
+    """Writes world.toml and one toml file per area."""
+    area_path = world_path / "areas"
+    area_path.mkdir(parents=True)
+    world_toml = {
+        "name": name,
+        "language": "en",
+        "areas": [area["name"] for area in areas],
+        "spawn": areas[0]["name"],
+        "intro_text": "You find yourself in a generated world.",
+    }
+    with (world_path / "world.toml").open("w", encoding="UTF-8") as stream:
+        toml.dump(world_toml, stream)
+    for area in areas:
+        toml_path = area_path / f"{area['name']}.toml"
+        with toml_path.open("w", encoding="UTF-8") as stream:
+            toml.dump(area, stream)
+
+
+def parse_args():
+    parser = ArgumentParser(description="Generate a large world for scale testing")
+    parser.add_argument("name", help="Name of the new world")
+    parser.add_argument("--areas", help="Number of areas", default=1000, type=int)
+    parser.add_argument("--fan-out", help="Gateways per area", default=3, type=int)
+    parser.add_argument(
+        "--locked", help="Share of locked gateways", default=0.2, type=float
+    )
+    parser.add_argument(
+        "--entities", help="Entities per area besides gateways", default=8, type=int
+    )
+    parser.add_argument("--seed", help="Seed for the generator", default=0, type=int)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    world_path = WORLDS_FOLDER / args.name
+    if world_path.exists():
+        print("A world with that name already exists.")
+        sys.exit(1)
+    generator = WorldGenerator(
+        args.seed, args.areas, args.fan_out, args.locked, args.entities
+    )
+    write_world(world_path, args.name, generator.generate())
+    print(f"Generated {args.areas} areas in {world_path}")
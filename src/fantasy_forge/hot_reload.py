@@ -0,0 +1,96 @@
+"""Hot reload
+
+The AreaWatcher polls the mtimes of a world's area files and reloads changed
+areas into the running world, see World.reload_area.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from pathlib import Path
+from threading import Event, Thread
+from typing import TYPE_CHECKING, Self
+
+from fantasy_forge.utils import read_toml
+
+logger = logging.getLogger(__name__)
+
+
+class AreaWatcher(Thread):
+    """Reloads area files when they change on disk."""
+
+    world: World
+    interval: float  # seconds between polls
+    _mtimes: dict[Path, int]
+
+    def __init__(self: Self, world: World, interval: float = 1.0):
+        super().__init__(name="area-watcher", daemon=True)
+        self.world = world
+        self.interval = interval
+        self._stop_event = Event()
+        self._mtimes = self._scan()
+
+    def _scan(self: Self) -> dict[Path, int]:
+        """Returns the mtimes of all area files."""
+        mtimes: dict[Path, int] = {}
+        for toml_path in self.world.path.glob("**/*.toml"):
+            if toml_path.parent.name != "areas":
+                continue
+            try:
+                mtimes[toml_path] = toml_path.stat().st_mtime_ns
+            except FileNotFoundError:
+                # deleted while we were looking
+                continue
+        return mtimes
+
+    def poll(self: Self) -> None:
+        """Reloads every area file which changed since the last poll.
+
+        Files which fail to reload are tried again on the next poll, e.g. if
+        an editor was still writing them.
+        """
+        mtimes = self._scan()
+        for toml_path, mtime in list(mtimes.items()):
+            if self._mtimes.get(toml_path) == mtime:
+                continue
+            start = time.perf_counter()
+            try:
+                area_dict = read_toml(toml_path)
+                actors = self.world.actors
+                if actors is None:
+                    area = self.world.reload_area(area_dict)
+                else:
+                    area = actors.run(
+                        area_dict["name"], self.world.reload_area, area_dict
+                    )
+            except Exception:
+                logger.exception("could not reload %s", toml_path)
+                # keep the old mtime, so it still counts as changed
+                old_mtime = self._mtimes.get(toml_path)
+                if old_mtime is None:
+                    del mtimes[toml_path]
+                else:
+                    mtimes[toml_path] = old_mtime
+                continue
+            if area is not None:
+                logger.info(
+                    "reloaded area %s from %s in %.1f ms",
+                    area.name,
+                    toml_path,
+                    (time.perf_counter() - start) * 1000,
+                )
+        for toml_path in self._mtimes.keys() - mtimes.keys():
+            logger.warning("%s was deleted, its area stays loaded", toml_path)
+        self._mtimes = mtimes
+
+    def run(self: Self) -> None:
+        while not self._stop_event.wait(self.interval):
+            self.poll()
+
+    def stop(self: Self) -> None:
+        self._stop_event.set()
+
+
+if TYPE_CHECKING:
+    from fantasy_forge.world import World
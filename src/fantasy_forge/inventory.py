@@ -1,13 +1,16 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Self
+import logging
+from threading import Lock
+from typing import TYPE_CHECKING, Any, Self
 
 from fantasy_forge.container import Container
 from fantasy_forge.entity import Entity
 from fantasy_forge.item import Item
-from fantasy_forge.localization import highlight_interactive
 from fantasy_forge.utils import UniqueDict
 
+logger = logging.getLogger(__name__)
+
 
 class InventoryFull(Exception):
     pass
@@ -18,26 +21,49 @@ class InventoryTooSmall(Exception):
 
 
 class Inventory(Container):
-    """An Inventory contains multiple entities."""
+    """An Inventory contains multiple entities.
+
+    Adding and popping items holds a lock, so the contents and
+    content_weight stay in step when several threads use the inventory,
+    e.g. a player dropping an item while being killed.
+    """
+
+    __slots__ = ("_lock",)
 
     def __init__(self: Self, messages: Messages, capacity: int):
         self.messages = messages
         self.capacity = capacity
         self.contents = UniqueDict()
+        self.content_weight = 0
+        self._lock = Lock()
 
-    def calculate_weight(self: Self) -> int:
-        weight = 0
-        for item in self.contents.values():
-            weight += item.weight
-        return weight
+    def __getstate__(self: Self) -> tuple[None, dict[str, Any]]:
+        # slotted objects are pickled as (None, slots), locks can't be pickled
+        _, slots = super().__getstate__()
+        del slots["_lock"]
+        return None, slots
+
+    def __setstate__(self: Self, state: tuple[None, dict[str, Any]]):
+        _, slots = state
+        for name, value in slots.items():
+            setattr(self, name, value)
+        self._lock = Lock()
+
+    def _debug_check(self: Self):
+        if logger.isEnabledFor(logging.DEBUG):
+            self.check_weight()
 
     def add(self: Self, item: Item) -> None:
         """Adds Item to inventory with respect to capacity."""
-        assert item.name not in self.contents
-        weight = self.calculate_weight()
-        if weight + item.weight <= self.capacity:
-            self.contents[item.name] = item
-        elif weight == self.capacity:
+        with self._lock:
+            assert item.name not in self.contents
+            weight = self.content_weight
+            if weight + item.weight <= self.capacity:
+                self.contents[item.name] = item
+                self.content_weight += item.weight
+                self._debug_check()
+                return
+        if weight == self.capacity:
             raise InventoryFull(
                 self.messages.l10n.format_value(
                     "inventory-capacity-message",
@@ -63,31 +89,30 @@ class Inventory(Container):
 
     def pop(self: Self, entity_name: str) -> Entity | None:
         """Pops item from inventory."""
-        if entity_name in self:
-            return self.contents.pop(entity_name)
-        return None
+        with self._lock:
+            item = self.contents.pop(entity_name, None)
+            if item is not None:
+                self.content_weight -= item.weight
+                self._debug_check()
+            return item
 
     def pop_all(self: Self) -> list[Item]:
         """Pops all items from the inventory, used for when the player dies/leaves the game in mp"""
-        items = list(self.contents.values())
-        self.contents.clear()
-        return items
-
-    def on_look(self: Self) -> str:
+        with self._lock:
+            items = list(self.contents.values())
+            self.contents.clear()
+            self.content_weight = 0
+            return items
+
+    def on_look(self: Self, actor: Player):
+        """Lists the contents to actor, one message per item."""
         if not self.contents:
-            return self.messages.l10n.format_value("inventory-look-empty-message")
-        else:
-            return self.messages.l10n.format_value(
-                "inventory-look-message",
-                {
-                    "items": ", ".join(
-                        [
-                            highlight_interactive(str(item)).format(None)
-                            + f" (weight: {item.weight})"
-                            for item in self
-                        ]
-                    ),
-                },
+            self.messages.to([actor], "inventory-look-empty-message")
+            return
+        self.messages.to([actor], "inventory-look-begin")
+        for item in self:
+            self.messages.to(
+                [actor], "inventory-look-item", item=item.name, weight=item.weight
             )
 
     def to_dict(self) -> dict:
@@ -99,3 +124,4 @@ class Inventory(Container):
 
 if TYPE_CHECKING:
     from fantasy_forge.messages import Messages
+    from fantasy_forge.player import Player
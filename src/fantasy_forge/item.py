@@ -8,6 +8,8 @@ from fantasy_forge.entity import Entity
 class Item(Entity):
     """An Item is an entity which can be picked up by the player."""
 
+    __slots__ = ("moveable", "carryable", "weight", "quest_item")
+
     __attributes__ = {
         **Entity.__attributes__,
         "moveable": bool,
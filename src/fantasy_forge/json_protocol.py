@@ -0,0 +1,193 @@
+"""JSON protocol
+
+A machine readable alternative to the text protocol of the multiplayer
+server, for bots and other frontends. See fantasy-forge-server --json-port.
+Every line in either direction is one JSON object.
+
+The server greets with
+    {"id": null, "protocol": "fantasy-forge", "version": 1, "languages": ["en"]}
+
+and the client logs in with
+    {"id": 1, "login": {"name": "alice", "description": "...", "language": "en"}}
+
+description and language are optional. Afterwards every request is a command:
+    {"id": 2, "command": "look around"}
+
+The id can be any JSON value, it is copied into the response:
+    {"id": 2, "events": [...], "stop": false}
+
+Events are messages with their id and parameters, so clients can render
+them themselves, or plain text like descriptions of entities:
+    {"message": "look-around-single", "params": {"object": "tv"}}
+    {"text": "an old television"}
+
+Events which aren't caused by a request of the client, like other players
+talking, are sent with "id": null. Failed requests get an error instead of
+events, which is a message as well. stop is true when the session ends.
+
+Requests don't have to wait for the previous response, they are processed
+in order and answered in order. So a client can send several commands in
+one write and match the responses by id.
+"""
+
+from __future__ import annotations
+
+import json
+from threading import Thread
+from typing import TYPE_CHECKING, Any, Callable, Generator, Optional, Self
+
+from fantasy_forge.area_actors import origin_thread
+
+PROTOCOL_VERSION = 1
+
+
+class JsonOutput:
+    """stdout of a JSON session, collects the events of each request.
+
+    output is the stdout of the text protocol, e.g. an OutboundQueue.
+    """
+
+    structured = True  # Messages.to sends message ids instead of text
+
+    _events: list[dict[str, Any]]  # of the current request
+    _owner: Optional[Thread]  # the thread running the current request
+
+    def __init__(self: Self, output):
+        self.output = output
+        self._request_id = None
+        self._events = []
+        self._owner = None
+
+    def begin(self: Self, request_id: Any):
+        """Starts collecting the events of a request."""
+        self._request_id = request_id
+        self._events = []
+        self._owner = origin_thread()
+
+    def end(self: Self, **fields: Any):
+        """Sends the response to the current request."""
+        self.send({"id": self._request_id, "events": self._events, **fields})
+        self._events = []
+        self._owner = None
+        self.output.flush()
+
+    def send(self: Self, reply: dict[str, Any]):
+        self.output.write(json.dumps(reply, default=str) + "\n")
+
+    def write(self: Self, text: str):
+        text = text.rstrip("\n")
+        if text:
+            self._add({"text": text})
+
+    def message(self: Self, message_id: str, parameters: dict[str, Any]):
+        self._add({"message": message_id, "params": parameters})
+
+    def _add(self: Self, event: dict[str, Any]):
+        if self._owner is origin_thread():
+            self._events.append(event)
+        else:
+            # e.g. another player talking
+            self.send({"id": None, "events": [event]})
+
+    def flush(self: Self):
+        if self._owner is None:
+            self.output.flush()
+
+
+def error(request_id: Any, message_id: str, **parameters: Any) -> dict[str, Any]:
+    return {"id": request_id, "error": {"message": message_id, "params": parameters}}
+
+
+def parse_request(line: str) -> dict[str, Any]:
+    """Returns a request as dict, raises ValueError if it isn't one."""
+    request = json.loads(line)
+    if not isinstance(request, dict):
+        raise ValueError("a request has to be an object")
+    request.setdefault("id", None)
+    return request
+
+
+def json_login(
+    world: World,
+) -> Generator[dict[str, Any], str, tuple[str, str, Optional[str], Any]]:
+    """Greets a new client and waits for a valid login request.
+
+    Like multiplayer.login this yields the reply to send and gets the next
+    line back. Returns name, description, locale and the id of the login
+    request, which should be answered with the events of entering the game.
+    The name is reserved in the world's name_registry.
+    """
+    locales = world.locales
+    reply = {
+        "id": None,
+        "protocol": "fantasy-forge",
+        "version": PROTOCOL_VERSION,
+        "languages": locales,
+    }
+    while True:
+        line = yield reply
+        try:
+            request = parse_request(line)
+        except ValueError as invalid:
+            reply = error(None, "invalid-request", reason=str(invalid))
+            continue
+        request_id = request["id"]
+        login = request.get("login")
+        if not isinstance(login, dict):
+            reply = error(request_id, "login-required")
+            continue
+        name = str(login.get("name", "")).strip()
+        description = str(login.get("description") or "the heroic player")
+        locale = login.get("language")
+        if not name:
+            reply = error(request_id, "character-name-empty")
+        elif locale is not None and locale not in locales:
+            reply = error(
+                request_id,
+                "language-unknown",
+                language=locale,
+                languages=", ".join(locales),
+            )
+        elif not world.name_registry.reserve(name):
+            reply = error(request_id, "character-name-taken", name=name)
+        else:
+            return name, description, locale, request_id
+
+
+def handle_request(
+    shell: Shell,
+    output: JsonOutput,
+    line: str,
+    run: Optional[Callable[..., bool]] = None,
+) -> bool:
+    """Runs the command of a request line, returns True to stop the session.
+
+    run calls shell.handle_line with the command, e.g. in the turn of the
+    player's area, see AreaActors.
+    """
+    try:
+        request = parse_request(line)
+    except ValueError as invalid:
+        output.send(error(None, "invalid-request", reason=str(invalid)))
+        output.flush()
+        return False
+    command = request.get("command")
+    if not isinstance(command, str):
+        output.send(error(request["id"], "command-required"))
+        output.flush()
+        return False
+    output.begin(request["id"])
+    stop = True
+    try:
+        if run is None:
+            stop = shell.handle_line(command)
+        else:
+            stop = run(shell.handle_line, command)
+    finally:
+        output.end(stop=stop)
+    return stop
+
+
+if TYPE_CHECKING:
+    from fantasy_forge.shell import Shell
+    from fantasy_forge.world import World
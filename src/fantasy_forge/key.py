@@ -1,7 +1,10 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Any, Self
+import sys
+from threading import Lock
+from typing import TYPE_CHECKING, Any, Iterator, Self
 
+from fantasy_forge.entity import Entity
 from fantasy_forge.item import Item
 from fantasy_forge.messages import Messages
 
@@ -9,6 +12,8 @@ from fantasy_forge.messages import Messages
 class Key(Item):
     """A Key can be used to unlock Gateways or Container."""
 
+    __slots__ = ("key_id", "used")
+
     __important_attributes__ = ("name", "key_id")
     __attributes__ = {**Item.__attributes__, "key_id": str, "used": bool}
 
@@ -31,7 +36,7 @@ class Key(Item):
         'description' (str): description of the entity (default: "")
         'obvious'(bool): whether the entity will be spotted immediately (default: False)
         """
-        self.key_id = config_dict.pop("key_id")
+        self.key_id = sys.intern(config_dict.pop("key_id"))
 
         self.moveable = True  # keys are moveable by default
         self.carryable = True  # keys are carryable by default
@@ -51,6 +56,88 @@ class Key(Item):
         return hash(self.key_id)
 
 
+class KeyRegistry:
+    """An index of all keys in the world and where they are.
+
+    Keys compare equal by their key_id, so they are tracked by identity here.
+    """
+
+    _holders: dict[int, tuple[Key, Entity]]  # id(key) -> (key, holder)
+    _key_ids: dict[str, dict[int, Key]]  # key_id -> {id(key): key}
+
+    def __init__(self: Self):
+        self._holders = {}
+        self._key_ids = {}
+        self._lock = Lock()
+
+    def __contains__(self: Self, key_id: str) -> bool:
+        """Returns if a key with that key_id exists."""
+        return bool(self._key_ids.get(key_id))
+
+    def __len__(self: Self) -> int:
+        return len(self._holders)
+
+    def find(self: Self, key_id: str) -> list[Key]:
+        """Returns all keys with that key_id."""
+        return list(self._key_ids.get(key_id, {}).values())
+
+    def holder(self: Self, key: Key) -> Entity | None:
+        """Returns the area, inventory or container the key is in."""
+        entry = self._holders.get(id(key))
+        if entry is None:
+            return None
+        return entry[1]
+
+    def move(self: Self, entity: Entity, holder: Entity) -> None:
+        """Records that an entity is now in holder, if it's a key."""
+        if not isinstance(entity, Key):
+            return
+        with self._lock:
+            self._holders[id(entity)] = (entity, holder)
+            self._key_ids.setdefault(entity.key_id, {})[id(entity)] = entity
+
+    def remove(self: Self, entity: Entity) -> None:
+        """Forgets a key."""
+        with self._lock:
+            if self._holders.pop(id(entity), None) is None:
+                return
+            key_ids = self._key_ids[entity.key_id]
+            del key_ids[id(entity)]
+            if not key_ids:
+                del self._key_ids[entity.key_id]
+
+    def add_contents(self: Self, holder: Area | Container) -> None:
+        """Registers all keys in holder, including containers and loot."""
+        for entity, direct_holder in nested_contents(holder):
+            self.move(entity, direct_holder)
+
+    def remove_contents(self: Self, holder: Area | Container) -> None:
+        """Forgets all keys in holder, including containers and loot."""
+        for entity, _ in nested_contents(holder):
+            self.remove(entity)
+
+
+def nested_contents(
+    holder: Area | Container,
+) -> Iterator[tuple[Entity, Area | Container]]:
+    """Yields the contents of holder and of everything inside of it.
+
+    Every entity comes with the area, inventory or container it is directly in.
+    """
+    from fantasy_forge.character import Character
+    from fantasy_forge.container import Container
+
+    for entity in holder.contents.values():
+        yield entity, holder
+        if isinstance(entity, Container):
+            yield from nested_contents(entity)
+        elif isinstance(entity, Character):
+            yield from nested_contents(entity.inventory)
+
+
 if TYPE_CHECKING:
     from fluent.runtime import FluentLocalization
 
+    from fantasy_forge.area import Area
+    from fantasy_forge.container import Container
+
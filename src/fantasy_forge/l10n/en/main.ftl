@@ -5,6 +5,11 @@ character-desc-prompt-multiplayer = Your current description is "{ $default_desc
 character-name-taken = This name already exists in this world. Choose something else please.
 character-name-taken-prompt = The name "{ INTER($name) }" already exists in this world. Choose something else please:
 character-name-empty = You have to input a name.
+language-prompt-multiplayer = Which language do you want to play in? ({ $languages }, press enter for { $default_language })
+language-unknown = Unknown language "{ $language }". Choose one of { $languages }:
+invalid-request = That's not a valid request: { $reason }
+login-required = Please log in first.
+command-required = The request has no command.
 bare-hands-name = bare hands
 bare-hands-description = the harmful hands of the player
 look-at-message = You look at { INTER($object) }.
@@ -55,7 +60,10 @@ drop-not-found = You can't drop { $item }.
 dropped = You dropped { INTER($item) }.
 cant-drop-quest-item = You can't drop { INTER($item) }, it's a quest item.
 enter-area-message = You are now in { $area }. You see:
-inventory-look-message = In the inventory you find { $items }.
+enter-area-name-taken = Something in { $area } has your name, so you can't go there.
+enter-area-handoff-failed = Something went wrong, you can't go to { $area } right now.
+inventory-look-begin = In the inventory you find:
+inventory-look-item = * { INTER($item) } (weight: { NUM($weight) })
 inventory-look-empty-message = Your inventory is empty.
 container-look-message = In the { $container } you find { $contents }.
 container-look-empty-message = The { $container } is empty.
@@ -65,6 +73,13 @@ inventory-item-not-found-message = Item { $item } couldn't be found.
 gateway-unlock-message = { INTER($name) } unlocked.
 gateway-lock-message = { INTER($name) } is now locked.
 gateway-locked-message = You can't use { INTER($gateway) } because it is locked.
+travel-message = You travel to { $area } through { $steps ->
+    [one] one gateway
+   *[other] { $steps } gateways
+}.
+travel-already-there = You are in { $area } already.
+travel-unknown-area = You don't know the way to { $area }.
+travel-no-route = There is no open way to { $area }.
 gateway-key-needed = You need a key to open { INTER($name) }.
 gateway-no-keys = You can't use { INTER($name) } like that.
 gateway-on-look-locked = It is locked.
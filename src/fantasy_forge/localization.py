@@ -1,21 +1,36 @@
+from functools import lru_cache
 from pathlib import Path
+from threading import Lock
 from typing import Any
 
 import huepy
-from fluent.runtime import FluentLocalization, FluentResourceLoader
+from fluent.runtime import FluentBundle, FluentLocalization, FluentResourceLoader
 from fluent.runtime.types import FluentNone
+from fluent.syntax.ast import Pattern
 
 DEFAULT_LOCALE: str = "en"
+FORMAT_CACHE_SIZE: int = 4096  # formatted messages with parameters
+HIGHLIGHT_CACHE_SIZE: int = 4096  # highlighted entity names and numbers
+
+
+@lru_cache(maxsize=HIGHLIGHT_CACHE_SIZE)
+def _bold_green(text: str) -> str:
+    return huepy.bold(huepy.green(text))
+
+
+@lru_cache(maxsize=HIGHLIGHT_CACHE_SIZE)
+def _bold_orange(text: str) -> str:
+    return huepy.bold(huepy.orange(text))
 
 
 def highlight_interactive(text: Any) -> FluentNone:
     """INTER() for the localization"""
-    return FluentNone(huepy.bold(huepy.green(str(text))))
+    return FluentNone(_bold_green(str(text)))
 
 
 def highlight_number(text: Any) -> FluentNone:
     """NUM() for the localization"""
-    return FluentNone(huepy.bold(huepy.orange(str(text))))
+    return FluentNone(_bold_orange(str(text)))
 
 
 def check_exists(obj: Any):
@@ -23,10 +38,104 @@ def check_exists(obj: Any):
     return str(not isinstance(obj, FluentNone)).lower()
 
 
-def get_fluent_locale(locale_path: Path, locale: str = DEFAULT_LOCALE) -> FluentLocalization:
+class CachedLocalization(FluentLocalization):
+    """A FluentLocalization which remembers its lookups and results.
+
+    All bundles are loaded up front and the pattern of every message is
+    looked up only once. Formatted messages are kept in an LRU cache keyed on
+    message id and parameters, so this relies on all localization functions
+    being pure. Parameters which can't be hashed are formatted every time.
+    Unknown message ids are returned unchanged like by FluentLocalization,
+    they are not cached because some callers pass readily formatted text.
+    """
+
+    _patterns: dict[str, tuple[FluentBundle, Pattern]]
+
+    def __init__(self, *args: Any, cache_size: int = FORMAT_CACHE_SIZE, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self._patterns = {}
+        # load all bundles now, so that threads never advance the bundle iterator
+        for _ in self._bundles():
+            pass
+        self._format_cached = lru_cache(maxsize=cache_size)(self._format)
+
+    def _lookup(self, msg_id: str) -> tuple[FluentBundle, Pattern] | None:
+        found = self._patterns.get(msg_id)
+        if found is not None:
+            return found
+        for bundle in self._bundles():
+            if not bundle.has_message(msg_id):
+                continue
+            msg = bundle.get_message(msg_id)
+            if not msg.value:
+                continue
+            found = self._patterns[msg_id] = (bundle, msg.value)
+            return found
+        return None
+
+    def _format(self, msg_id: str, key: tuple) -> str:
+        bundle, pattern = self._patterns[msg_id]
+        args = {name: value for name, _, value in key}
+        val, _errors = bundle.format_pattern(pattern, args)
+        return val
+
+    def format_value(self, msg_id: str, args: dict[str, Any] | None = None) -> str:
+        found = self._lookup(msg_id)
+        if found is None:
+            return msg_id
+        if not args:
+            return self._format_cached(msg_id, ())
+        # the type is part of the key, because 1 == 1.0 == True
+        key = tuple((name, type(value), value) for name, value in args.items())
+        try:
+            return self._format_cached(msg_id, key)
+        except TypeError:
+            # unhashable parameters
+            bundle, pattern = found
+            val, _errors = bundle.format_pattern(pattern, args)
+            return val
+
+    def cache_info(self):
+        """Returns hits and misses of the format cache, see functools.lru_cache."""
+        return self._format_cached.cache_info()
+
+
+# shared by all worlds and players, see get_fluent_locale
+_localizations: dict[tuple[str, str], CachedLocalization] = {}
+_localizations_lock = Lock()
+
+
+def available_locales(locale_path: Path) -> list[str]:
+    """Returns the locales in a locale path like l10n/{locale}."""
+    return sorted(
+        path.name
+        for path in locale_path.parent.iterdir()
+        if (path / "main.ftl").exists()
+    )
+
+
+def get_fluent_locale(
+    locale_path: Path, locale: str = DEFAULT_LOCALE
+) -> FluentLocalization:
+    """Returns the localization for a locale.
+
+    Localizations are created once per process and locale, so all players
+    with the same locale share the compiled bundles and the format cache.
+    Messages missing in a locale fall back to DEFAULT_LOCALE.
+    """
+    key = (str(locale_path), locale)
+    with _localizations_lock:
+        l10n = _localizations.get(key)
+        if l10n is None:
+            l10n = _localizations[key] = _create_localization(locale_path, locale)
+    return l10n
+
+
+def _create_localization(locale_path: Path, locale: str) -> CachedLocalization:
+    locales = [locale] if locale == DEFAULT_LOCALE else [locale, DEFAULT_LOCALE]
     fluent_loader: FluentResourceLoader = FluentResourceLoader(str(locale_path))
-    l10n = FluentLocalization(
-        locales=[locale],
+    l10n = CachedLocalization(
+        locales=locales,
         resource_ids=["main.ftl"],
         resource_loader=fluent_loader,
         functions={
@@ -1,10 +1,10 @@
 import logging
 import shutil
+import sys
 from argparse import ArgumentParser
 from importlib import resources
 from pathlib import Path
 from sys import argv
-from threading import current_thread
 from typing import Any
 
 from fantasy_forge.area import Area
@@ -27,6 +27,28 @@ def parse_args(config: Config, argv=argv[1:]):
     parser.add_argument(
         "--loglevel", help="Severity Level for logging", default=config.loglevel
     )
+    parser.add_argument(
+        "--language", help="Language to play in (default: the world's language)"
+    )
+    parser.add_argument(
+        "--no-snapshot",
+        help="Always load the world from its toml files",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--parallel",
+        help="Parse the world's toml files in parallel",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--lazy", help="Load areas when they are first entered", action="store_true"
+    )
+    parser.add_argument(
+        "--max-areas",
+        help="How many areas a lazy world keeps in memory",
+        default=None,
+        type=int,
+    )
     return parser.parse_args(argv)
 
 
@@ -43,7 +65,21 @@ def main():
     logger.info("load world %s", args.world)
 
     # set player name and load world
-    world = World.load(args.world)
+    world = World.load(
+        args.world,
+        use_snapshot=not args.no_snapshot,
+        parallel=args.parallel,
+        lazy=args.lazy,
+        max_areas=args.max_areas,
+    )
+
+    if args.language is not None and args.language not in world.locales:
+        print(
+            world.l10n.format_value(
+                "unknown-language-error", {"language": args.language}
+            )
+        )
+        sys.exit(1)
 
     name_input = input(
         world.l10n.format_value("character-name-prompt", {"default_name": args.name})
@@ -51,45 +87,27 @@ def main():
     )
 
     while True:
-        if not any(
-            (
-                (name_input or args.name) in area.contents.keys()
-                for area in world.areas.values()
+        player_name = name_input or args.name
+        if world.name_registry.reserve(player_name):
+            break
+        name_input = input(
+            world.l10n.format_value(
+                "character-name-taken-prompt", {"name": player_name}
+            )
+            + " "
+        )
+    if name_input:
+        setattr(config, "name", name_input)
+        print(
+            world.l10n.format_value(
+                "character-name-change-successful", {"chosen_name": name_input}
             )
-        ):
-            if name_input:
-                player_name = name_input
-                setattr(config, "name", name_input)
-                print(
-                    world.l10n.format_value(
-                        "character-name-change-successful", {"chosen_name": name_input}
-                    )
-                )
-                break
-            else:
-                player_name = args.name
-                break
-        else:
-            if name_input:
-                name_input = input(
-                    world.l10n.format_value(
-                        "character-name-taken-prompt", {"name": name_input}
-                    )
-                    + " "
-                )
-            else:
-                name_input = input(
-                    world.l10n.format_value(
-                        "character-name-taken-prompt", {"name": args.name}
-                    )
-                    + " "
-                )
-            continue
+        )
 
     config.save()
 
     print()
-    player = Player(world, player_name, description, current_thread())
+    player = Player(world, player_name, description, locale=args.language)
 
     # main loop
     logger.info("starting mainloop for player %s", player)
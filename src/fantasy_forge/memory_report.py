@@ -0,0 +1,97 @@
+"""Memory report
+
+fantasy-forge-memory-report loads a world and compares the bytes per entity
+of the slotted entity classes with shared strings to what the same entities
+take with a per-instance __dict__ and their own copy of every string.
+The contents dicts of areas and containers are the same in both cases and
+are not counted.
+"""
+
+from __future__ import annotations
+
+import sys
+import tracemalloc
+from argparse import ArgumentParser
+from typing import Any, Iterator
+
+from fantasy_forge.entity import Entity
+from fantasy_forge.key import nested_contents
+from fantasy_forge.world import World
+
+
+def world_entities(world: World) -> Iterator[Entity]:
+    """Yields all areas and everything in them."""
+    for area in world.areas.values():
+        yield area
+        for entity, _ in nested_contents(area):
+            yield entity
+
+
+def slot_values(entity: Entity) -> dict[str, Any]:
+    """Returns the values of all slots of an entity, in definition order."""
+    values: dict[str, Any] = {}
+    for cls in reversed(type(entity).__mro__):
+        for slot in cls.__dict__.get("__slots__", ()):
+            if hasattr(entity, slot):
+                values[slot] = getattr(entity, slot)
+    return values
+
+
+def string_values(values: dict[str, Any]) -> Iterator[str]:
+    for value in values.values():
+        if isinstance(value, str):
+            yield value
+        elif isinstance(value, list):
+            yield from (item for item in value if isinstance(item, str))
+
+
+def dict_object_bytes(entities: list[Entity]) -> int:
+    """Measures the same entities as plain objects with a __dict__."""
+    # one plain class per entity class, so their instances share dict keys
+    classes = {type(entity) for entity in entities}
+    plain_types: dict[type, type] = {cls: type(cls.__name__, (), {}) for cls in classes}
+    plain_objects: list[object] = []
+    tracemalloc.start()
+    start, _ = tracemalloc.get_traced_memory()
+    for entity in entities:
+        plain = plain_types[type(entity)]()
+        for name, value in slot_values(entity).items():
+            setattr(plain, name, value)
+        plain_objects.append(plain)
+    end, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # the list holding the objects isn't part of them
+    return end - start - sys.getsizeof(plain_objects)
+
+
+def parse_args():
+    parser = ArgumentParser(description="Report the memory used by a world")
+    parser.add_argument("world", help="Name or path of the world")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    world = World.load(args.world, use_snapshot=False)
+    entities = list(world_entities(world))
+    count = len(entities)
+
+    slotted_bytes = sum(sys.getsizeof(entity) for entity in entities)
+    dict_bytes = dict_object_bytes(entities)
+
+    shared_strings: dict[int, str] = {}
+    copied_bytes = 0
+    for entity in entities:
+        for text in string_values(slot_values(entity)):
+            shared_strings[id(text)] = text
+            copied_bytes += sys.getsizeof(text)
+    shared_bytes = sum(sys.getsizeof(text) for text in shared_strings.values())
+
+    print(f"{count} entities in {world.name}")
+    print(f"{'bytes per entity':<20}{'before':>10}{'after':>10}")
+    for label, before, after in (
+        ("objects", dict_bytes, slotted_bytes),
+        ("strings", copied_bytes, shared_bytes),
+        ("total", dict_bytes + copied_bytes, slotted_bytes + shared_bytes),
+    ):
+        print(f"{label:<20}{before / count:>10.1f}{after / count:>10.1f}")
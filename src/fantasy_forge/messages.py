@@ -22,14 +22,34 @@ class Messages:
         message_id: str,
         **parameters: Any,
     ):
+        """Writes a message to every player in receivers, in their language.
+
+        The message is formatted once per language, not once per receiver.
+        In multiplayer stdout is an OutboundQueue, so this never waits for
+        slow clients. Clients of the JSON protocol get the message id and the
+        parameters instead, see json_protocol.JsonOutput.
+        Nothing here is shared between calls except the localizations, whose
+        caches are safe to use from several threads, so any thread can send
+        messages to any player.
+        """
         from fantasy_forge.player import Player
 
-        localized = self.l10n.format_value(message_id, parameters)
+        # players of the same language share their localization
+        localized: dict[int, str] = {}
         for receiver in receivers:
             if not isinstance(receiver, Player):
                 # only deliver messages to actual players
                 continue
-            receiver.shell.stdout.write(localized + "\n")
+            stdout = receiver.shell.stdout
+            if getattr(stdout, "structured", False):
+                stdout.message(message_id, parameters)
+                continue
+            l10n = receiver.l10n
+            text = localized.get(id(l10n))
+            if text is None:
+                text = l10n.format_value(message_id, parameters) + "\n"
+                localized[id(l10n)] = text
+            stdout.write(text)
 
 
 if TYPE_CHECKING:
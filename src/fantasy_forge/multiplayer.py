@@ -1,18 +1,37 @@
+import asyncio
+import logging
+import os
 from argparse import ArgumentParser
-from socket import AF_INET6
+from functools import partial
+from queue import Empty, Queue
+from socket import AF_INET6, SHUT_RD
 from socketserver import StreamRequestHandler, TCPServer, ThreadingMixIn
-from threading import current_thread
-from typing import Optional
+from threading import Thread, current_thread
+from typing import Callable, Generator, Optional
 
+from fantasy_forge.area_actors import AreaActors, origin_thread
+from fantasy_forge.hot_reload import AreaWatcher
+from fantasy_forge.json_protocol import JsonOutput, handle_request, json_login
 from fantasy_forge.player import Player
+from fantasy_forge.session import (
+    DEFAULT_IDLE_TIMEOUT,
+    IdleReaper,
+    Session,
+    SessionManager,
+)
 from fantasy_forge.world import World
 
+logger = logging.getLogger(__name__)
+
+DEFAULT_HIGH_WATER = 1000  # messages waiting for a client before it counts as slow
+
 
 class FakeFile:
     """Wrap rfile or wfile to convert bytes to str and vice-versa."""
 
-    def __init__(self, file):
+    def __init__(self, file, on_read: Optional[Callable[[], None]] = None):
         self.file = file
+        self.on_read = on_read  # called after every line, e.g. Session.touch
 
     def write(self, text: str):
         self.file.write(text.encode())
@@ -22,77 +41,300 @@ class FakeFile:
             text = self.file.readline(max_length)
         else:
             text = self.file.readline()
+        if self.on_read is not None:
+            self.on_read()
         return text.decode()
 
     def flush(self):
         self.file.flush()
 
 
+class OutboundQueue:
+    """Queues text for a client, a writer thread sends it.
+
+    write never blocks, so a stalled client only delays its own messages and
+    not the player who sent them. If more than high_water messages are
+    waiting, further messages are dropped and on_overflow is called,
+    e.g. to disconnect the client.
+
+    Text written by the client's own thread, or by area tasks running its
+    commands, is buffered until flush. So the output of a command is sent as
+    a single message, see Shell.onecmd.
+    Messages from other players are queued right away. The writer thread
+    sends everything queued by the time it gets to it in one write.
+    """
+
+    def __init__(
+        self,
+        file: FakeFile,
+        high_water: int = DEFAULT_HIGH_WATER,
+        on_overflow: Optional[Callable[[], None]] = None,
+    ):
+        self.file = file
+        self.high_water = high_water
+        self.on_overflow = on_overflow
+        self.dropped = 0
+        self._owner = current_thread()
+        self._buffer: list[str] = []
+        self._queue: Queue[Optional[str]] = Queue()
+        self._closed = False
+        self._writer = Thread(target=self._run, daemon=True)
+        self._writer.start()
+
+    def write(self, text: str):
+        if origin_thread() is self._owner:
+            self._buffer.append(text)
+        else:
+            self._put(text)
+
+    def _put(self, text: str):
+        if self._closed:
+            return
+        if self._queue.qsize() >= self.high_water:
+            if not self.dropped:
+                logger.warning("client is too slow, dropping messages")
+                if self.on_overflow is not None:
+                    self.on_overflow()
+            self.dropped += 1
+            return
+        self.dropped = 0
+        self._queue.put(text)
+
+    def flush(self):
+        """Queues the buffered text of the client's own thread."""
+        if self._buffer:
+            text = "".join(self._buffer)
+            self._buffer.clear()
+            self._put(text)
+
+    def close(self, timeout: Optional[float] = None):
+        """Sends everything still queued and stops the writer thread."""
+        self.flush()
+        self._closed = True
+        self._queue.put(None)
+        self._writer.join(timeout)
+
+    def _run(self):
+        stopped = False
+        while not stopped:
+            text = self._queue.get()
+            if text is None:
+                break
+            # coalesce everything that is waiting already
+            parts = [text]
+            while True:
+                try:
+                    text = self._queue.get_nowait()
+                except Empty:
+                    break
+                if text is None:
+                    stopped = True
+                    break
+                parts.append(text)
+            try:
+                self.file.write("".join(parts))
+                self.file.flush()
+            except OSError:
+                # the client is gone, the reading side notices that too
+                self._closed = True
+                break
+
+
+def login(world: World) -> Generator[str, str, tuple[str, str, Optional[str]]]:
+    """Asks a new client for name, description and language.
+
+    This yields the text to send and gets the next line of input back, so
+    the threaded and the asyncio server share it.
+    Returns name, description and locale, see Player.
+    The name is reserved in the world's name_registry. If the client leaves
+    before the login is done, close the generator to release it again.
+    """
+    l10n = world.l10n
+    text = l10n.format_value(
+        "character-name-prompt-multiplayer", {"default_name": "Player"}
+    )
+    while True:
+        name_input = (yield text + " ").rstrip()
+        if not name_input:
+            text = l10n.format_value("character-name-empty")
+        elif not world.name_registry.reserve(name_input):
+            text = l10n.format_value("character-name-taken", {"name": name_input})
+        else:
+            break
+
+    try:
+        return (yield from _login_details(world, name_input))
+    except GeneratorExit:
+        world.name_registry.release(name_input)
+        raise
+
+
+def _login_details(
+    world: World, name_input: str
+) -> Generator[str, str, tuple[str, str, Optional[str]]]:
+    """Asks for description and language, see login."""
+    l10n = world.l10n
+    player_desc = "the heroic player"
+    desc_input = (
+        yield l10n.format_value(
+            "character-desc-prompt-multiplayer",
+            {"default_description": player_desc},
+        )
+        + " "
+    ).rstrip()
+    if desc_input:
+        player_desc = desc_input
+
+    locales = world.locales
+    if len(locales) < 2:
+        return name_input, player_desc, None
+    languages = ", ".join(locales)
+    text = l10n.format_value(
+        "language-prompt-multiplayer",
+        {"languages": languages, "default_language": l10n.locales[0]},
+    )
+    while True:
+        locale_input = (yield text + " ").strip()
+        if not locale_input:
+            return name_input, player_desc, None
+        if locale_input in locales:
+            return name_input, player_desc, locale_input
+        text = l10n.format_value(
+            "language-unknown", {"language": locale_input, "languages": languages}
+        )
+
+
 class MyTCPHandler(StreamRequestHandler):
     def handle(self):
-        rfile = FakeFile(self.rfile)
-        wfile = FakeFile(self.wfile)
+        session = self.server.sessions.open(self.client_address[0], self.disconnect)
+        rfile = FakeFile(self.rfile, session.touch)
+        wfile = OutboundQueue(
+            FakeFile(self.wfile),
+            self.server.high_water,
+            partial(session.stop, "too slow") if self.server.disconnect_slow else None,
+        )
+        try:
+            self.play(session, rfile, wfile)
+        finally:
+            wfile.close(timeout=5)
+            self.server.sessions.close(session)
+
+    def in_area(self, player: Player, function: Callable, *args):
+        """Runs function in the turn of the player's area, see AreaActors."""
+        actors = self.server.world.actors
+        if actors is None:
+            return function(*args)
+        return actors.run(player.area.name, function, *args)
+
+    def disconnect(self):
+        """Ends reading from the socket, the player then leaves like on EOF.
+
+        Writing still works, so the last messages reach the client.
+        """
+        self.request.shutdown(SHUT_RD)
+
+    def play(self, session: Session, rfile: FakeFile, wfile: OutboundQueue):
+        world = self.server.world
+        dialogue = login(world)
+        text = next(dialogue)
         while True:
-            wfile.write(
-                self.server.world.l10n.format_value(
-                    "character-name-prompt-multiplayer", {"default_name": "Player"}
-                )
-                + " "
-            )
-            name_input = rfile.readline(10000).rstrip()
-            if any(
-                (
-                    name_input in area.contents.keys()
-                    for area in self.server.world.areas.values()
-                )
-            ):
-                wfile.write(
-                    self.server.world.l10n.format_value(
-                        "character-name-taken", name=name_input
-                    )
-                    + " "
-                )
-                continue
-            if name_input:
-                player_name = name_input
+            wfile.write(text)
+            wfile.flush()
+            line = rfile.readline(10000)
+            if not line:
+                # the client left during the login
+                dialogue.close()
+                return
+            try:
+                text = dialogue.send(line)
+            except StopIteration as done:
+                player_name, player_desc, locale = done.value
                 break
-            else:
-                wfile.write(
-                    self.server.world.l10n.format_value("character-name-empty") + " "
-                )
-                continue
-        player_desc = "the heroic player"
-        wfile.write(
-            self.server.world.l10n.format_value(
-                "character-desc-prompt-multiplayer",
-                {"default_description": player_desc},
-            )
-            + " "
-        )
-        desc_input = rfile.readline(10000).rstrip()
-        if desc_input:
-            player_desc = desc_input
         ip_adress = self.client_address[0]
         thread = current_thread()
         print(f"new connection from {player_name} @ {ip_adress} on {thread}")
-        self.server.world.messages.to(
-            self.server.world.players, "player-join", player_name=player_name
-        )
-        player = Player(
-            self.server.world,
-            player_name,
-            player_desc,
-            thread,
-        )
-        player.main_loop(stdin=rfile, stdout=wfile)
-        print(f"closed connection from {player_name} @ {ip_adress} on {thread}")
-        self.server.world.messages.to(
-            self.server.world.players, "player-quit", player_name=player_name
-        )
+        world.messages.to(world.players, "player-join", player_name=player_name)
+        player = Player(world, player_name, player_desc, session, locale=locale)
+        session.player = player
+        self.in_area(player, player.enter_game, rfile, wfile)
+        shell = player.shell
+        stop = False
+        try:
+            while not stop:
+                wfile.write(shell.prompt)
+                wfile.flush()
+                line = rfile.readline(10000)
+                line = line.rstrip("\r\n") if line else "EOF"
+                try:
+                    stop = self.in_area(player, shell.handle_line, line)
+                except Exception:
+                    # one broken command shouldn't end the session
+                    logger.exception("command of %s failed: %r", player_name, line)
+                    stop = line == "EOF"
+        finally:
+            self.in_area(player, player.leave_game)
+            print(f"closed connection from {player_name} @ {ip_adress} on {thread}")
+            world.messages.to(world.players, "player-quit", player_name=player_name)
+
+
+class JsonTCPHandler(MyTCPHandler):
+    """Speaks the JSON protocol instead of text, see json_protocol."""
+
+    def play(self, session: Session, rfile: FakeFile, wfile: OutboundQueue):
+        world = self.server.world
+        output = JsonOutput(wfile)
+        dialogue = json_login(world)
+        reply = next(dialogue)
+        while True:
+            output.send(reply)
+            output.flush()
+            line = rfile.readline(10000)
+            if not line:
+                return
+            try:
+                reply = dialogue.send(line)
+            except StopIteration as done:
+                player_name, player_desc, locale, request_id = done.value
+                break
+        ip_adress = self.client_address[0]
+        print(f"new json connection from {player_name} @ {ip_adress}")
+        world.messages.to(world.players, "player-join", player_name=player_name)
+        player = Player(world, player_name, player_desc, session, locale=locale)
+        session.player = player
+        output.begin(request_id)
+        self.in_area(player, player.enter_game, rfile, output)
+        output.end(stop=False)
+        shell = player.shell
+        stop = False
+        try:
+            while not stop:
+                line = rfile.readline(10000)
+                try:
+                    if not line:
+                        stop = self.in_area(player, shell.handle_line, "EOF")
+                    else:
+                        stop = handle_request(
+                            shell, output, line, partial(self.in_area, player)
+                        )
+                except Exception:
+                    # one broken command shouldn't end the session
+                    logger.exception("command of %s failed: %r", player_name, line)
+                    stop = not line
+        finally:
+            self.in_area(player, player.leave_game)
+            print(f"closed json connection from {player_name} @ {ip_adress}")
+            world.messages.to(world.players, "player-quit", player_name=player_name)
 
 
 class ThreadedTCPServer6(ThreadingMixIn, TCPServer):
     address_family = AF_INET6
+    high_water = DEFAULT_HIGH_WATER  # see OutboundQueue
+    disconnect_slow = False  # disconnect slow clients instead of dropping messages
+    sessions: SessionManager
+
+    def __init__(self, *args, idle_timeout: Optional[float] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.sessions = SessionManager(idle_timeout)
 
 
 def parse_args():
@@ -101,19 +343,192 @@ def parse_args():
     parser.add_argument("--world", help="The world to play in", default="chaosdorf")
     parser.add_argument("--host", help="The address to bind to", default="::")
     parser.add_argument("--port", help="The port to bind to", default=9999, type=int)
+    parser.add_argument(
+        "--no-snapshot",
+        help="Always load the world from its toml files",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--parallel",
+        help="Parse the world's toml files in parallel",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--lazy", help="Load areas when they are first entered", action="store_true"
+    )
+    parser.add_argument(
+        "--max-areas",
+        help="How many areas a lazy world keeps in memory",
+        default=None,
+        type=int,
+    )
+    parser.add_argument(
+        "--watch",
+        help="Reload area files when they change",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--watch-interval",
+        help="Seconds between checks for changed area files",
+        default=1.0,
+        type=float,
+    )
+    parser.add_argument(
+        "--json-port",
+        help="Also serve the JSON protocol for bots and frontends on this port",
+        default=None,
+        type=int,
+    )
+    parser.add_argument(
+        "--server",
+        help=(
+            "asyncio serves all clients from one thread, threaded uses a thread "
+            "each, sharded splits the areas between processes"
+        ),
+        choices=("asyncio", "threaded", "sharded"),
+        default="asyncio",
+    )
+    parser.add_argument(
+        "--area-actors",
+        help=(
+            "Threaded server: run the commands of each area one after another "
+            "on a thread pool, instead of in the session threads"
+        ),
+        action="store_true",
+    )
+    parser.add_argument(
+        "--shards",
+        help="Number of worker processes of the sharded server",
+        default=os.cpu_count(),
+        type=int,
+    )
+    parser.add_argument(
+        "--high-water",
+        help=(
+            "Messages (threaded) or unsent bytes (asyncio) waiting for a client "
+            "before it counts as slow"
+        ),
+        default=None,
+        type=int,
+    )
+    parser.add_argument(
+        "--disconnect-slow",
+        help="Disconnect slow clients instead of dropping their messages",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--idle-timeout",
+        help="Seconds without input before a client is disconnected, 0 never does",
+        default=DEFAULT_IDLE_TIMEOUT,
+        type=float,
+    )
+    parser.add_argument("--loglevel", help="Severity Level for logging", default="INFO")
     return parser.parse_args()
 
 
 def main():
     args = parse_args()
+    logging.basicConfig(level=getattr(logging, args.loglevel.upper(), None))
+
+    if args.server == "sharded":
+        from fantasy_forge.async_server import DEFAULT_HIGH_WATER_BYTES
+        from fantasy_forge.sharding import serve as serve_sharded
+
+        # every shard loads the world itself
+        if args.json_port is not None or args.watch:
+            logger.warning("the sharded server has no --json-port or --watch")
+        print(f"Serving {args.world} on [{args.host}]:{args.port}")
+        try:
+            asyncio.run(
+                serve_sharded(
+                    args.world,
+                    args.host,
+                    args.port,
+                    args.shards,
+                    args.high_water or DEFAULT_HIGH_WATER_BYTES,
+                    args.disconnect_slow,
+                    args.idle_timeout or None,
+                    args.max_areas,
+                )
+            )
+        except KeyboardInterrupt:
+            pass
+        return
 
     # first, create the world
-    world = World.load(args.world)
+    world = World.load(
+        args.world,
+        use_snapshot=not args.no_snapshot,
+        parallel=args.parallel,
+        lazy=args.lazy,
+        max_areas=args.max_areas,
+    )
+
+    watcher = None
+    if args.watch:
+        watcher = AreaWatcher(world, args.watch_interval)
+
+    idle_timeout = args.idle_timeout or None
+    if args.server == "asyncio":
+        if args.area_actors:
+            logger.warning("--area-actors only applies to the threaded server")
+        from fantasy_forge.async_server import DEFAULT_HIGH_WATER_BYTES, serve
+
+        print(f"Serving {args.world} on [{args.host}]:{args.port}")
+        try:
+            asyncio.run(
+                serve(
+                    world,
+                    args.host,
+                    args.port,
+                    args.high_water or DEFAULT_HIGH_WATER_BYTES,
+                    args.disconnect_slow,
+                    idle_timeout,
+                    args.json_port,
+                    watcher,
+                )
+            )
+        except KeyboardInterrupt:
+            pass
+        return
+
+    if args.area_actors:
+        world.actors = AreaActors()
+    if watcher is not None:
+        watcher.start()
 
     # Create the server, binding to localhost on port 9999
-    with ThreadedTCPServer6((args.host, args.port), MyTCPHandler) as server:
+    with ThreadedTCPServer6(
+        (args.host, args.port), MyTCPHandler, idle_timeout=idle_timeout
+    ) as server:
         server.world = world
+        server.high_water = args.high_water or DEFAULT_HIGH_WATER
+        server.disconnect_slow = args.disconnect_slow
+        reaper = IdleReaper(server.sessions)
+        reaper.start()
+        json_server = None
+        if args.json_port is not None:
+            json_server = ThreadedTCPServer6(
+                (args.host, args.json_port), JsonTCPHandler
+            )
+            json_server.world = world
+            json_server.high_water = server.high_water
+            json_server.disconnect_slow = server.disconnect_slow
+            # one reaper for the sessions of both servers
+            json_server.sessions = server.sessions
+            Thread(target=json_server.serve_forever, daemon=True).start()
+            print(f"Serving JSON on [{args.host}]:{args.json_port}")
         print(f"Serving {args.world} on [{args.host}]:{args.port}")
         # Activate the server; this will keep running until you
         # interrupt the program with Ctrl-C
-        server.serve_forever()
+        try:
+            server.serve_forever()
+        finally:
+            # let the sessions end, the server waits for their threads
+            reaper.stop()
+            server.sessions.stop_all()
+            if json_server is not None:
+                json_server.shutdown()
+                json_server.server_close()
+    if world.actors is not None:
+        world.actors.shutdown()
@@ -0,0 +1,75 @@
+"""Name registry
+
+Entities in an area are stored by name, so a player can't be called like any
+other entity in the world. The NameRegistry knows the names of all entities in
+loaded areas, including the contents of containers and inventories, and the
+names of all players.
+
+Player names are reserved before the player is created, so two logins
+choosing the same name at the same time can't both get it.
+
+A lazy world only registers the names of an area when it loads the area, see
+World.get_area. A player who took such a name before can't enter that area.
+"""
+
+from __future__ import annotations
+
+from threading import Lock
+from typing import TYPE_CHECKING, Self
+
+from fantasy_forge.key import nested_contents
+
+
+class NameRegistry:
+    """The taken names of a world."""
+
+    _entity_names: set[str]  # of everything in loaded areas, except players
+    _player_names: set[str]  # reserved at login, released when the player leaves
+
+    def __init__(self: Self):
+        self._entity_names = set()
+        self._player_names = set()
+        self._lock = Lock()
+
+    def __contains__(self: Self, name: str) -> bool:
+        """Returns if the name is taken."""
+        return name in self._player_names or name in self._entity_names
+
+    def __len__(self: Self) -> int:
+        return len(self._entity_names) + len(self._player_names)
+
+    def add_contents(self: Self, holder: Area | Container) -> set[str]:
+        """Registers the names of everything in holder, including nested entities.
+
+        Names are never removed again, because an item which is picked up or an
+        area which is evicted still keeps its name.
+        Returns the names which players have already.
+        """
+        from fantasy_forge.player import Player
+
+        names = {
+            entity.name
+            for entity, _ in nested_contents(holder)
+            if not isinstance(entity, Player)
+        }
+        with self._lock:
+            self._entity_names |= names
+            return names & self._player_names
+
+    def reserve(self: Self, name: str) -> bool:
+        """Takes a name for a player, returns False if it is taken already."""
+        with self._lock:
+            if name in self:
+                return False
+            self._player_names.add(name)
+            return True
+
+    def release(self: Self, name: str) -> None:
+        """Frees the name of a player who left or never joined."""
+        with self._lock:
+            self._player_names.discard(name)
+
+
+if TYPE_CHECKING:
+    from fantasy_forge.area import Area
+    from fantasy_forge.container import Container
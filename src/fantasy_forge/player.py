@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 import random
-from threading import Thread
 from typing import TYPE_CHECKING, Optional, Self
 
 from fantasy_forge.area import Area
@@ -11,11 +10,15 @@ from fantasy_forge.entity import Entity
 from fantasy_forge.gateway import Gateway
 from fantasy_forge.inventory import Inventory, InventoryFull, InventoryTooSmall
 from fantasy_forge.item import Item
+from fantasy_forge.messages import Messages
 from fantasy_forge.shell import Shell
-from fantasy_forge.utils import UniqueDict, terminate_thread
+from fantasy_forge.utils import UniqueDict
 from fantasy_forge.weapon import Weapon
 
 if TYPE_CHECKING:
+    from fluent.runtime import FluentLocalization
+
+    from fantasy_forge.session import Session
     from fantasy_forge.world import World
 
 
@@ -27,18 +30,20 @@ class Player(Character):
 
     area: Area  # the area we are currently in
     shell: Shell
-    thread: Thread
+    session: Optional[Session]  # the connection in multiplayer
     seen_entities: UniqueDict[str, Entity]
     armour_slots: dict[str, Armour]
     world: World
+    l10n: FluentLocalization  # the player's language, shared with other players
 
     def __init__(
         self: Self,
         world: World,
         name: str,
         description: int,
-        thread: Thread,
+        session: Optional[Session] = None,
         health: int = BASE_PLAYER_HEALTH,
+        locale: Optional[str] = None,
     ):
         super().__init__(
             world.messages,
@@ -49,7 +54,8 @@ class Player(Character):
             ),
         )
         self.world = world
-        self.thread = thread
+        self.session = session
+        self.l10n = world.l10n_for(locale)
         self.area = Area.empty(world.messages)
 
         # put us in the void
@@ -57,6 +63,9 @@ class Player(Character):
         # transition to the next area.
         self.area.contents[self.name] = self
         self.seen_entities = UniqueDict()
+        # set when the area was reloaded, see refresh_seen_entities
+        self.seen_outdated = False
+        self.visited_areas: set[str] = set()
 
         # define armour slots
         self.armour_slots: dict[str, Armour | None] = {}
@@ -79,7 +88,7 @@ class Player(Character):
         for item in self.inventory:
             self.seen_entities[item.name] = item
         self.area.on_look(self)
-        for entity in self.area.contents.values():
+        for entity in list(self.area.contents.values()):
             if entity is self:
                 continue
             self.messages.to(
@@ -89,6 +98,22 @@ class Player(Character):
             )
             self.seen_entities[entity.name] = entity
 
+    def refresh_seen_entities(self):
+        """Swaps the seen entities of a reloaded area for the new ones.
+
+        World.reload_area only flags the players, this runs before their next
+        command, in their own thread.
+        """
+        self.seen_outdated = False
+        contents = self.area.contents
+        for name in list(self.seen_entities):
+            if name in self.inventory:
+                continue
+            self.seen_entities.pop(name)
+            entity = contents.get(name)
+            if entity is not None:
+                self.seen_entities[name] = entity
+
     def inspect(self, name: str):
         """Calls the on_look method of an object."""
         entity = self.seen_entities.get(name)
@@ -120,15 +145,23 @@ class Player(Character):
             self.seen_entities.pop(item_name)
             return
         if isinstance(item, Item) and item.carryable:
+            # take it out of the area first, so of several players picking it
+            # up at once only one gets it
+            if self.area.contents.pop(item_name, None) is None:
+                self.messages.to([self], "item-vanished")
+                self.seen_entities.pop(item_name, None)
+                return
             try:
                 self.inventory.add(item)
             except InventoryFull:
+                self.area.contents[item_name] = item
                 self.messages.to([self], "pick-up-failed-inv-full")
             except InventoryTooSmall:
+                self.area.contents[item_name] = item
                 self.messages.to([self], "pick-up-failed-inv-too-small")
             else:
                 # picking up items keeps them in seen_entities
-                self.area.contents.pop(item_name)
+                self.world.key_registry.move(item, self.inventory)
             self.messages.to(
                 [self],
                 "pick-up-item-message",
@@ -163,10 +196,18 @@ class Player(Character):
 
         # by equipping the item is implicitly picked up
         if item not in self.inventory.contents.values():
-            # if it's not already in the inventory, place it there
-            self.inventory.add(item)
+            # if it's not already in the inventory, take it out of the area
+            if self.area.contents.pop(item_name, None) is None:
+                self.messages.to([self], "item-vanished")
+                self.seen_entities.pop(item_name, None)
+                return
+            try:
+                self.inventory.add(item)
+            except (InventoryFull, InventoryTooSmall):
+                self.area.contents[item_name] = item
+                raise
             # picking up items keeps them in seen_entities
-            self.area.contents.pop(item_name)
+            self.world.key_registry.move(item, self.inventory)
             self.messages.to(
                 [self],
                 "pick-up-item-message",
@@ -275,11 +316,17 @@ class Player(Character):
         else:
             self._on_death(target)
 
-    def _on_death(self: Self, killer: Player):
-        super()._on_death(killer)
+    def _on_death(self: Self, killer: Player) -> bool:
+        if not super()._on_death(killer):
+            return False
+        self.world.remove_player(self)
         self.messages.to([self], "player-died")
-        # we cant actually close the connection, and threads dont have a kill method, so we copied a function from stackoverflow to do it for us.
-        terminate_thread(self.thread)
+        # the shell stops after the current command, which might be the
+        # killer's command in another session
+        self.shell.stop_requested = True
+        if self.session is not None:
+            self.session.stop("died")
+        return True
 
     def use(self, subject_name: str, other_name: str | None = None):
         subject = self.seen_entities.get(subject_name)
@@ -342,33 +389,73 @@ class Player(Character):
                 gateway=gateway.name,
             )
             return
-        self.enter_area(gateway.target)
+        self.move_to(gateway.target_str)
+
+    def travel(self: Self, area_name: str):
+        """Goes to an area visited before, on the shortest open route.
+
+        The areas on the way are only passed, so only the last area is
+        entered like with go.
+        """
+        if area_name == self.area.name:
+            self.messages.to([self], "travel-already-there", area=area_name)
+            return
+        if area_name not in self.visited_areas:
+            self.messages.to([self], "travel-unknown-area", area=area_name)
+            return
+        route = self.world.area_graph.route(self.area.name, area_name)
+        if not route:
+            self.messages.to([self], "travel-no-route", area=area_name)
+            return
+        self.messages.to([self], "travel-message", area=area_name, steps=len(route))
+        self.move_to(route[-1].target_str)
+
+    def move_to(self: Self, area_name: str):
+        """Enters an area by name, which might be served by another shard."""
+        shard = self.world.shard
+        if shard is not None and not shard.owns(area_name):
+            shard.hand_off(self, area_name)
+            return
+        self.enter_area(self.world.get_area(area_name))
 
     def enter_area(self, new_area: Area):
         """Enters a new area."""
         # leave the previous area
         self.leave_area()
-        # enter new area
+        actors = self.world.actors
+        if actors is not None:
+            # the new area is changed in its own turn
+            actors.post(new_area.name, self._arrive, new_area)
+        else:
+            self._arrive(new_area)
+
+    def _arrive(self, new_area: Area):
+        # enter new area, unless something there has our name already
+        try:
+            new_area.contents[self.name] = self
+        except KeyError:
+            self.messages.to([self], "enter-area-name-taken", area=new_area.name)
+            # go back, like walking into a wall
+            self.area.contents[self.name] = self
+            return
         self.area = new_area
+        self.visited_areas.add(new_area.name)
         # clear seen items, but re-add inventory items
         self.seen_entities.clear()
         for item in self.inventory:
             self.seen_entities[item.name] = item
-        # enter the new one
-        self.area.contents[self.name] = self
         self.messages.to(
             [self],
             "enter-area-message",
             area=self.area.name,
         )
-        for entity in self.area.contents.values():
-            if entity.obvious:
-                self.messages.to(
-                    [self],
-                    "look-around-single",
-                    object=entity.name,
-                )
-                self.seen_entities[entity.name] = entity
+        for entity in self.area.obvious_entities:
+            self.messages.to(
+                [self],
+                "look-around-single",
+                object=entity.name,
+            )
+            self.seen_entities[entity.name] = entity
         self.world.messages.to(
             [player for player in self.area.players if player != self],
             "player-entered-room",
@@ -404,6 +491,7 @@ class Player(Character):
             )
             return
         self.area.contents[item.name] = item  # adds item to current area
+        self.world.key_registry.move(item, self.area)
         if self.main_hand is item:  # clears main hand if item was dropped from it
             self.main_hand = None
         self.messages.to(
@@ -413,9 +501,7 @@ class Player(Character):
         )
 
     def shout(self: Self, message: str) -> None:
-        self.messages.to(
-            self.world.players, "player-shouts", player=self.name, message=message
-        )
+        self.world.broadcast("player-shouts", player=self.name, message=message)
 
     def say(self: Self, message: str) -> None:
         self.messages.to(
@@ -423,30 +509,47 @@ class Player(Character):
         )
 
     def whisper(self: Self, target: str, message: str) -> None:
-        for player in self.area.players:
-            if player.name == target:
-                self.messages.to(
-                    [player, self],
-                    "player-whispers",
-                    player=self.name,
-                    target=target,
-                    message=message,
-                )
-                break
-        else:
+        player = self.area.contents.by_kind["players"].get(target)
+        if player is None:
             self.messages.to([self], "whisper-invalid")
+            return
+        self.messages.to(
+            [player, self],
+            "player-whispers",
+            player=self.name,
+            target=target,
+            message=message,
+        )
 
     def main_loop(self, stdin=None, stdout=None):
         """Runs the game."""
+        self.enter_game(stdin=stdin, stdout=stdout)
+        self.shell.cmdloop()
+        self.leave_game()
+
+    def enter_game(self, stdin=None, stdout=None):
+        """Creates the shell and puts the player into the spawn.
+
+        Call this and leave_game yourself to feed the shell line by line,
+        see Shell.handle_line.
+        """
         if stdout is None:
             print(self.world.intro_text)
         else:
             stdout.write(self.world.intro_text + "\n")
-        self.shell = Shell(self.world.messages, self, stdin=stdin, stdout=stdout)
+        self.shell = Shell(Messages(self.l10n), self, stdin=stdin, stdout=stdout)
         self.enter_area(self.world.spawn)
-        self.shell.cmdloop()
+        self.world.add_player(self)
+
+    def leave_game(self):
+        """Drops the inventory and leaves the world."""
+        if not self.alive:
+            # _on_death cleaned up already
+            return
+        self.world.remove_player(self)
         for item in self.inventory.pop_all():
             self.area.contents[item.name] = item
+            self.world.key_registry.move(item, self.area)
         # afterwards, leave the current area
         self.leave_area()
         quit_message = random.choice(
@@ -0,0 +1,110 @@
+"""Entity prototypes
+
+A world can declare prototypes in the [prototypes] table of its world.toml:
+
+    [prototypes.goblin]
+    kind = "enemy"
+    description = "a small, angry goblin"
+    health = 20
+    loot = [{ name = "rusty dagger", kind = "weapon", damage = 3 }]
+
+Any entry in contents or loot can then reference a prototype and override
+some of its fields:
+
+    [[contents]]
+    prototype = "goblin"
+    name = "goblin chief"
+    health = 40
+
+Prototypes can be based on other prototypes the same way.
+Instances are plain dictionaries again, so the entity classes don't know
+about prototypes. Strings and numbers of a prototype are shared by all of its
+instances, only the dicts and lists are copied, because the entities consume
+their config dicts while they are created.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Optional, Self
+
+CHILD_FIELDS = ("contents", "loot")  # fields which hold further entities
+
+
+def _copy(value: Any) -> Any:
+    """Copies dicts and lists, everything else is immutable and shared."""
+    if isinstance(value, dict):
+        return {key: _copy(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_copy(item) for item in value]
+    return value
+
+
+class PrototypeRegistry:
+    """The prototypes of a world by name."""
+
+    _prototypes: dict[str, dict[str, Any]]  # with their base prototypes merged
+
+    def __init__(self: Self, prototypes: Optional[dict[str, dict[str, Any]]] = None):
+        self._prototypes = {}
+        declared = prototypes or {}
+        for name in declared:
+            self._merge_bases(name, declared, ())
+
+    def _merge_bases(
+        self: Self,
+        name: str,
+        declared: dict[str, dict[str, Any]],
+        chain: tuple[str, ...],
+    ) -> dict[str, Any]:
+        if name in self._prototypes:
+            return self._prototypes[name]
+        if name in chain:
+            raise ValueError(f"prototype {name!r} is based on itself")
+        if name not in declared:
+            raise KeyError(f"unknown prototype {name!r}")
+        prototype = dict(declared[name])
+        base = prototype.pop("prototype", None)
+        if base is not None:
+            base_prototype = self._merge_bases(base, declared, (*chain, name))
+            prototype = {**base_prototype, **prototype}
+        self._prototypes[name] = prototype
+        return prototype
+
+    def __contains__(self: Self, name: str) -> bool:
+        return name in self._prototypes
+
+    def __len__(self: Self) -> int:
+        return len(self._prototypes)
+
+    def instantiate(
+        self: Self, name: str, overrides: Optional[dict[str, Any]] = None
+    ) -> dict[str, Any]:
+        """Returns the config dict of a new instance of a prototype.
+
+        Raises KeyError for unknown prototypes.
+        """
+        if name not in self._prototypes:
+            raise KeyError(f"unknown prototype {name!r}")
+        entity_dict = _copy(self._prototypes[name])
+        if overrides:
+            entity_dict.update(overrides)
+        return self.expand(entity_dict)
+
+    def expand(self: Self, entity_dict: dict[str, Any]) -> dict[str, Any]:
+        """Replaces all prototype references in the contents and loot of entity_dict.
+
+        entity_dict is changed in place and returned.
+        """
+        for field in CHILD_FIELDS:
+            children = entity_dict.get(field)
+            if not isinstance(children, list):
+                continue
+            for index, child in enumerate(children):
+                if not isinstance(child, dict):
+                    continue
+                if "prototype" in child:
+                    name = child.pop("prototype")
+                    children[index] = self.instantiate(name, child)
+                else:
+                    self.expand(child)
+        return entity_dict
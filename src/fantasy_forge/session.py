@@ -0,0 +1,127 @@
+"""Sessions
+
+A session is the connection of one client to a server. Sessions are ended
+cooperatively: Session.stop calls the disconnect callback of the server,
+which makes the pending read of the session return EOF, so the player leaves
+through the normal end of the shell loop and everything is cleaned up there.
+
+The SessionManager knows all sessions of a server. It ends sessions which were
+idle for too long and all sessions when the server shuts down.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from threading import Event, Lock, Thread
+from typing import TYPE_CHECKING, Callable, Optional, Self
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_IDLE_TIMEOUT = 1800.0  # seconds without input before a session is ended
+REAP_INTERVAL = 10.0  # seconds between checks for idle sessions
+
+
+class Session:
+    """The connection of a client."""
+
+    address: str
+    player: Optional[Player]  # set after the login
+    stopped: bool
+    last_input: float  # time.monotonic() of the last input
+
+    def __init__(self: Self, address: str, disconnect: Callable[[], None]):
+        self.address = address
+        self.player = None
+        self.stopped = False
+        self.last_input = time.monotonic()
+        self._disconnect = disconnect
+
+    def touch(self: Self):
+        """Marks the session as active, call this on every input."""
+        self.last_input = time.monotonic()
+
+    @property
+    def idle_time(self: Self) -> float:
+        return time.monotonic() - self.last_input
+
+    def stop(self: Self, reason: str):
+        """Ends the session, its shell sees EOF with the next read."""
+        if self.stopped:
+            return
+        self.stopped = True
+        name = self.address if self.player is None else self.player.name
+        logger.info("ending session of %s: %s", name, reason)
+        try:
+            self._disconnect()
+        except OSError:
+            # the client is gone already
+            pass
+
+
+class SessionManager:
+    """All sessions of a server."""
+
+    idle_timeout: Optional[float]  # None never ends idle sessions
+    _sessions: set[Session]
+
+    def __init__(self: Self, idle_timeout: Optional[float] = DEFAULT_IDLE_TIMEOUT):
+        self.idle_timeout = idle_timeout
+        self._sessions = set()
+        self._lock = Lock()
+
+    def open(self: Self, address: str, disconnect: Callable[[], None]) -> Session:
+        session = Session(address, disconnect)
+        with self._lock:
+            self._sessions.add(session)
+        return session
+
+    def close(self: Self, session: Session):
+        """Forgets a session, after its connection was closed."""
+        session.stopped = True
+        with self._lock:
+            self._sessions.discard(session)
+
+    def __len__(self: Self) -> int:
+        return len(self._sessions)
+
+    def reap(self: Self) -> int:
+        """Ends all idle sessions and returns how many there were."""
+        if self.idle_timeout is None:
+            return 0
+        with self._lock:
+            idle = [
+                session
+                for session in self._sessions
+                if session.idle_time > self.idle_timeout
+            ]
+        for session in idle:
+            session.stop(f"idle for {session.idle_time:.0f} seconds")
+        return len(idle)
+
+    def stop_all(self: Self, reason: str = "server shutdown"):
+        with self._lock:
+            sessions = list(self._sessions)
+        for session in sessions:
+            session.stop(reason)
+
+
+class IdleReaper(Thread):
+    """Calls SessionManager.reap regularly, for the threaded server."""
+
+    def __init__(self: Self, sessions: SessionManager, interval: float = REAP_INTERVAL):
+        super().__init__(name="idle-reaper", daemon=True)
+        self.sessions = sessions
+        self.interval = interval
+        self._stop_event = Event()
+
+    def run(self: Self) -> None:
+        while not self._stop_event.wait(self.interval):
+            self.sessions.reap()
+
+    def stop(self: Self) -> None:
+        self._stop_event.set()
+
+
+if TYPE_CHECKING:
+    from fantasy_forge.player import Player
@@ -0,0 +1,464 @@
+"""Sharded server
+
+Serves one world from several processes, so it isn't limited to one core.
+The areas are split between shard worker processes by a hash of their name.
+Every worker loads the world lazily, so it only keeps the areas its players
+go to in memory. The front process owns the client sockets, runs the login
+and passes every line of input to the worker of the player's area.
+
+When a player goes through a gateway into an area of another shard, the
+worker sends the player over to the front: name, description, health,
+language, visited areas and the pickled inventory with the equipped items.
+The front starts the player in the worker of the new area. Lines which
+arrive at the old worker afterwards are sent back to the front and on to
+the new worker, so the order of the commands is kept.
+
+Messages to all players, like shouts, are routed through the front to all
+other workers, see World.broadcast. Everything else only reaches the
+players of the same shard, e.g. whispers to players in the same area.
+
+Every area exists in one shard only, so all changes to it happen in one
+process. Looking at a gateway only loads its target in the shard which
+serves the target, see Gateway.on_look.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import zlib
+from asyncio import StreamReader, StreamWriter
+from functools import partial
+from itertools import count
+from multiprocessing.connection import Connection
+from typing import Any, Optional, Self
+
+from fantasy_forge.async_server import (
+    DEFAULT_HIGH_WATER_BYTES,
+    StreamOutput,
+    read_line,
+    reap_idle,
+)
+from fantasy_forge.messages import Messages
+from fantasy_forge.multiplayer import login
+from fantasy_forge.player import BASE_PLAYER_HEALTH, Player
+from fantasy_forge.session import Session, SessionManager
+from fantasy_forge.shell import Shell
+from fantasy_forge.snapshot import dump_entities, load_entities
+from fantasy_forge.world import World
+
+logger = logging.getLogger(__name__)
+
+
+def shard_of(area_name: str, shards: int) -> int:
+    """Returns the index of the shard which serves an area."""
+    return zlib.crc32(area_name.encode()) % shards
+
+
+def player_state(player: Player, area_name: str) -> dict[str, Any]:
+    """Returns everything needed to recreate a player in another shard."""
+    return {
+        "name": player.name,
+        "description": player.description,
+        "health": player.health,
+        "locale": player.l10n.locales[0],
+        "area": area_name,
+        "visited_areas": sorted(player.visited_areas),
+        # pickled together, so the equipped items stay the ones in the inventory
+        "items": dump_entities(
+            (list(player.inventory), player.main_hand, player.armour_slots)
+        ),
+    }
+
+
+class ShardOutput:
+    """stdout of a player in a shard, sends the text to the front."""
+
+    def __init__(self: Self, worker: ShardWorker, session_id: int):
+        self.worker = worker
+        self.session_id = session_id
+        self._buffer: list[str] = []
+
+    def write(self: Self, text: str):
+        if not self._buffer:
+            self.worker.dirty.append(self)
+        self._buffer.append(text)
+
+    def flush(self: Self):
+        if self._buffer:
+            self.worker.send("output", self.session_id, "".join(self._buffer))
+            self._buffer.clear()
+
+
+class ShardWorker:
+    """Runs the players of the areas of one shard, in its own process."""
+
+    index: int
+    shards: int  # number of shards
+    world: World
+    players: dict[int, Player]  # session id -> player
+    dirty: list[ShardOutput]  # outputs with unsent text
+
+    def __init__(self: Self, world: World, index: int, shards: int, conn: Connection):
+        self.world = world
+        self.index = index
+        self.shards = shards
+        self.conn = conn
+        self.players = {}
+        self.dirty = []
+        world.shard = self
+
+    def owns(self: Self, area_name: str) -> bool:
+        return shard_of(area_name, self.shards) == self.index
+
+    def send(self: Self, *message: Any):
+        self.conn.send(message)
+
+    def broadcast(self: Self, message_id: str, parameters: dict[str, Any]):
+        """Sends a message to the players of all other shards."""
+        self.send("broadcast", message_id, parameters)
+
+    def hand_off(self: Self, player: Player, area_name: str):
+        """Moves a player to the shard of area_name."""
+        session_id = player.shell.stdout.session_id
+        try:
+            state = player_state(player, area_name)
+        except Exception:
+            # the player stays here, handle_line sends the prompt
+            logger.exception("couldn't hand off %s to %s", player.name, area_name)
+            player.messages.to([player], "enter-area-handoff-failed", area=area_name)
+            return
+        # like leave_game, but the inventory goes along
+        player.shell.stdout.flush()
+        self.world.remove_player(player)
+        for item in player.inventory:
+            self.world.key_registry.remove(item)
+        player.leave_area()
+        del self.players[session_id]
+        logger.info("%s leaves for shard of %s", player.name, area_name)
+        self.send("handoff", session_id, area_name, state)
+
+    def join(self: Self, session_id: int, state: dict[str, Any], intro: bool):
+        """Recreates a player who logged in or came from another shard.
+
+        If that fails, the session is closed, otherwise the front would keep
+        sending its lines here.
+        """
+        try:
+            self._join(session_id, state, intro)
+        except Exception:
+            logger.exception("%s couldn't join shard %d", state["name"], self.index)
+            player = self.players.pop(session_id, None)
+            if player is not None:
+                for item in player.inventory:
+                    self.world.key_registry.remove(item)
+                player.shell.stdout.flush()
+            self.send("closed", session_id)
+
+    def _join(self: Self, session_id: int, state: dict[str, Any], intro: bool):
+        world = self.world
+        player = Player(
+            world,
+            state["name"],
+            state["description"],
+            health=state["health"],
+            locale=state["locale"],
+        )
+        if state["items"] is not None:
+            items, main_hand, armour_slots = load_entities(
+                state["items"], world.messages
+            )
+            for item in items:
+                player.inventory.add(item)
+                world.key_registry.move(item, player.inventory)
+            player.main_hand = main_hand
+            player.armour_slots = armour_slots
+        player.visited_areas.update(state["visited_areas"])
+
+        output = ShardOutput(self, session_id)
+        if intro:
+            output.write(world.intro_text + "\n")
+        player.shell = Shell(Messages(player.l10n), player, stdout=output)
+        self.players[session_id] = player
+        area = world.get_area(state["area"])
+        player.enter_area(area)
+        if player.area is not area:
+            # e.g. something in the area has the player's name
+            raise RuntimeError(f"{player.name} couldn't enter {area.name}")
+        world.add_player(player)
+        output.write(player.shell.prompt)
+
+    def handle_line(self: Self, session_id: int, line: str):
+        player = self.players.get(session_id)
+        if player is None:
+            # the player moved on while the line was on its way
+            self.send("forward", session_id, line)
+            return
+        if player.shell.handle_line(line):
+            player.leave_game()
+            self.close(session_id)
+        elif session_id in self.players:
+            # the new shard sends the prompt after a handoff
+            player.shell.stdout.write(player.shell.prompt)
+
+    def close(self: Self, session_id: int):
+        player = self.players.pop(session_id)
+        player.shell.stdout.flush()
+        self.send("closed", session_id)
+
+    def run(self: Self):
+        while True:
+            try:
+                kind, *args = self.conn.recv()
+            except EOFError:
+                # the front is gone
+                break
+            if kind == "stop":
+                break
+            try:
+                if kind == "join":
+                    self.join(*args)
+                elif kind == "line":
+                    self.handle_line(*args)
+                elif kind == "broadcast":
+                    message_id, parameters = args
+                    self.world.messages.to(self.world.players, message_id, **parameters)
+            except Exception:
+                # don't take the other players of the shard down as well
+                logger.exception("shard %d failed to handle %s", self.index, kind)
+            # players killed by the command end their session, see Player._on_death
+            for session_id, player in list(self.players.items()):
+                if player.shell.stop_requested:
+                    self.close(session_id)
+            for output in self.dirty:
+                output.flush()
+            self.dirty.clear()
+
+
+def run_shard(
+    world_name: str,
+    index: int,
+    shards: int,
+    conn: Connection,
+    max_areas: Optional[int],
+    loglevel: int,
+):
+    """The main function of a worker process."""
+    logging.basicConfig(level=loglevel)
+    world = World.load(world_name, lazy=True, max_areas=max_areas)
+    ShardWorker(world, index, shards, conn).run()
+
+
+class ShardFront:
+    """Owns the client sockets and routes between them and the shard workers."""
+
+    world: World  # lazily loaded, for the login and the names of the players
+    outputs: dict[int, StreamOutput]  # session id -> output of the client
+    sessions: dict[int, Session]
+    routes: dict[int, int]  # session id -> index of the shard of the player
+
+    def __init__(
+        self: Self,
+        world: World,
+        world_name: str,
+        shards: int,
+        max_areas: Optional[int] = None,
+    ):
+        self.world = world
+        self.outputs = {}
+        self.sessions = {}
+        self.routes = {}
+        self._done: dict[int, asyncio.Event] = {}  # set when the shard is done
+        self._ids = count()
+        self._conns: list[Connection] = []
+        self._processes = []
+        # spawn, the front already runs an event loop and threads
+        context = multiprocessing.get_context("spawn")
+        for index in range(shards):
+            conn, worker_conn = context.Pipe()
+            process = context.Process(
+                target=run_shard,
+                args=(
+                    world_name,
+                    index,
+                    shards,
+                    worker_conn,
+                    max_areas,
+                    logging.getLogger().level,
+                ),
+                name=f"shard-{index}",
+                daemon=True,
+            )
+            process.start()
+            self._conns.append(conn)
+            self._processes.append(process)
+
+    def start(self: Self):
+        loop = asyncio.get_running_loop()
+        for conn in self._conns:
+            loop.add_reader(conn.fileno(), self._receive, conn)
+
+    def stop(self: Self):
+        loop = asyncio.get_running_loop()
+        for conn in self._conns:
+            loop.remove_reader(conn.fileno())
+            conn.send(("stop",))
+        for process in self._processes:
+            process.join(timeout=5)
+
+    def shard_of(self: Self, area_name: str) -> int:
+        return shard_of(area_name, len(self._conns))
+
+    def _send(self: Self, shard: int, *message: Any):
+        self._conns[shard].send(message)
+
+    def broadcast(
+        self: Self,
+        message_id: str,
+        parameters: dict[str, Any],
+        except_shard: Optional[int] = None,
+    ):
+        for shard in range(len(self._conns)):
+            if shard != except_shard:
+                self._send(shard, "broadcast", message_id, parameters)
+
+    def _receive(self: Self, conn: Connection):
+        while conn.poll():
+            try:
+                kind, *args = conn.recv()
+            except EOFError:
+                logger.error("shard %d died", self._conns.index(conn))
+                asyncio.get_running_loop().remove_reader(conn.fileno())
+                return
+            if kind == "output":
+                session_id, text = args
+                output = self.outputs.get(session_id)
+                if output is not None:
+                    output.write(text)
+            elif kind == "handoff":
+                session_id, area_name, state = args
+                shard = self.shard_of(area_name)
+                self.routes[session_id] = shard
+                self._send(shard, "join", session_id, state, False)
+            elif kind == "forward":
+                session_id, line = args
+                shard = self.routes.get(session_id)
+                if shard == self._conns.index(conn):
+                    # the shard doesn't know the player, sending it back
+                    # would bounce the line forever
+                    logger.warning("dropping a line for session %d", session_id)
+                elif shard is not None:
+                    self._send(shard, "line", session_id, line)
+            elif kind == "broadcast":
+                message_id, parameters = args
+                self.broadcast(message_id, parameters, self._conns.index(conn))
+            elif kind == "closed":
+                (session_id,) = args
+                del self.routes[session_id]
+                self._done[session_id].set()
+                self.sessions[session_id].stop("left the game")
+
+    async def play(
+        self: Self, session: Session, reader: StreamReader, output: StreamOutput
+    ):
+        """Runs the login and passes the input of a client to the shards."""
+        world = self.world
+        dialogue = login(world)
+        text = next(dialogue)
+        while True:
+            output.write(text)
+            output.flush()
+            line = await read_line(reader, session)
+            if line is None:
+                dialogue.close()
+                return
+            try:
+                text = dialogue.send(line)
+            except StopIteration as done:
+                player_name, player_desc, locale = done.value
+                break
+
+        session_id = next(self._ids)
+        print(f"new connection from {player_name} @ {session.address}")
+        self.broadcast("player-join", {"player_name": player_name})
+        self.outputs[session_id] = output
+        self.sessions[session_id] = session
+        shard = self.shard_of(world.spawn_str)
+        self.routes[session_id] = shard
+        state = {
+            "name": player_name,
+            "description": player_desc,
+            "health": BASE_PLAYER_HEALTH,
+            "locale": locale,
+            "area": world.spawn_str,
+            "visited_areas": [],
+            "items": None,
+        }
+        done = self._done[session_id] = asyncio.Event()
+        self._send(shard, "join", session_id, state, True)
+        try:
+            while True:
+                line = await read_line(reader, session)
+                shard = self.routes.get(session_id)
+                if shard is None:
+                    # the shard ended the session, e.g. on quit
+                    break
+                self._send(shard, "line", session_id, "EOF" if line is None else line)
+                if line is None:
+                    # the client left, wait until the player left the game
+                    await done.wait()
+                    break
+        finally:
+            del self.outputs[session_id]
+            del self.sessions[session_id]
+            del self._done[session_id]
+            world.name_registry.release(player_name)
+        print(f"closed connection from {player_name} @ {session.address}")
+        self.broadcast("player-quit", {"player_name": player_name})
+
+
+async def serve(
+    world_name: str,
+    host: str,
+    port: int,
+    shards: int,
+    high_water: int = DEFAULT_HIGH_WATER_BYTES,
+    disconnect_slow: bool = False,
+    idle_timeout: Optional[float] = None,
+    max_areas: Optional[int] = None,
+):
+    """Serves a world from several processes until the task is cancelled."""
+    world = World.load(world_name, lazy=True, max_areas=max_areas)
+    front = ShardFront(world, world_name, shards, max_areas)
+    front.start()
+    sessions = SessionManager(idle_timeout)
+
+    async def handle(reader: StreamReader, writer: StreamWriter):
+        peer = writer.get_extra_info("peername")
+        session = sessions.open(peer[0], reader.feed_eof)
+        output = StreamOutput(
+            writer,
+            high_water,
+            partial(session.stop, "too slow") if disconnect_slow else None,
+        )
+        try:
+            await front.play(session, reader, output)
+        finally:
+            sessions.close(session)
+            output.flush()
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    server = await asyncio.start_server(handle, host, port)
+    reaper = asyncio.create_task(reap_idle(sessions))
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        reaper.cancel()
+        sessions.stop_all()
+        front.stop()
@@ -26,22 +26,22 @@ class Shell(Cmd):
     messages: Messages
     prompt = "> "
     histfile: str
+    stop_requested: bool
 
     def __new__(
         cls, messages: Messages, player: Player, stdin=None, stdout=None
     ) -> Shell:
-        match messages.l10n.locales[0]:
-            case "en":
-                shell_type = ShellEn
-            case default:
-                raise RuntimeError(
-                    messages.l10n.format_value(
-                        "unknown-language-error",
-                        {
-                            "language": default,
-                        },
-                    )
+        locale = messages.l10n.locales[0]
+        shell_type = SHELL_TYPES.get(locale)
+        if shell_type is None:
+            raise RuntimeError(
+                messages.l10n.format_value(
+                    "unknown-language-error",
+                    {
+                        "language": locale,
+                    },
                 )
+            )
         shell = super().__new__(shell_type)
         return shell
 
@@ -52,6 +52,7 @@ class Shell(Cmd):
             self.use_rawinput = False
         self.player = player
         self.messages = messages
+        self.stop_requested = False  # cmdloop ends after the current command
 
         if not stdin and not stdout:  # check if singleplayer
             self.histfile = xdg_cache_home() / "fantasy_forge.hist"
@@ -66,6 +67,31 @@ class Shell(Cmd):
             readline.set_history_length(histfile_size)
             readline.write_history_file(self.histfile)
 
+    def postcmd(self, stop: bool, line: str) -> bool:
+        """Stops the loop when requested, e.g. because the player died."""
+        return stop or self.stop_requested
+
+    def handle_line(self, line: str) -> bool:
+        """Runs one line of input like cmdloop does, returns True to stop.
+
+        This is for callers which read the input themselves.
+        """
+        line = self.precmd(line)
+        stop = self.onecmd(line)
+        return self.postcmd(stop, line)
+
+    def onecmd(self, line: str) -> bool:
+        """Runs a command and sends its whole output at once."""
+        if self.stop_requested:
+            # e.g. the player died while this line was on its way
+            return True
+        if self.player.seen_outdated:
+            self.player.refresh_seen_entities()
+        try:
+            return super().onecmd(line)
+        finally:
+            self.stdout.flush()
+
     def completenames(self, text, *ignored):
         """This is called when completing the command itself.
 
@@ -77,20 +103,15 @@ class Shell(Cmd):
     def default(self, line: str):
         if len(line) < 3:
             """Display an error message, because the command was invalid."""
-            self.stdout.write(
-                self.messages.l10n.format_value("shell-invalid-command") + "\n"
-            )
+            self.messages.to([self.player], "shell-invalid-command")
 
         else:
             """Check for potential typos and recommend closest command"""
             commands = [x[3:] for x in self.get_names() if x.startswith("do_")]
             possibilities = fuzzywuzzy.process.extract(line, commands)
             closest_cmd, closest_ratio = possibilities[0]
-            self.stdout.write(
-                self.messages.l10n.format_value(
-                    "shell-invalid-command-suggest", {"closest_cmd": closest_cmd}
-                )
-                + "\n"
+            self.messages.to(
+                [self.player], "shell-invalid-command-suggest", closest_cmd=closest_cmd
             )
 
     def do_EOF(self, arg: str) -> bool:
@@ -141,7 +162,7 @@ class ShellEn(Shell):
             self.player.look_around()
             logger.debug("%s looks around" % self.player.name)
         else:
-            self.stdout.write(self.messages.l10n.format_value("incomplete-look") + "\n")
+            self.messages.to([self.player], "incomplete-look")
 
     def complete_look(
         self,
@@ -220,9 +241,31 @@ class ShellEn(Shell):
             completions.remove(" ")
         return completions
 
+    def do_travel(self, arg: str):
+        """travel <area>"""
+        self.player.travel(arg)
+        logger.debug("%s travels to %s", self.player.name, arg)
+
+    def complete_travel(
+        self,
+        text: str,
+        line: str,
+        begidx: int,
+        endidx: int,
+    ):
+        area_name = line.removeprefix("travel ").strip()
+        completions = [
+            text + name.removeprefix(area_name).strip() + " "
+            for name in self.player.visited_areas
+            if name.startswith(area_name) and name != self.player.area.name
+        ]
+        if " " in completions:
+            completions.remove(" ")
+        return completions
+
     def do_inventory(self, arg: str):
         """shows the contents of the players inventory"""
-        self.messages.to([self.player], self.player.inventory.on_look())
+        self.player.inventory.on_look(self.player)
 
     def do_armour(self, arg: str):
         """shows the players armour"""
@@ -430,5 +473,11 @@ class ShellEn(Shell):
         return completions
 
 
+# the shell of each language, its commands are in the language too
+SHELL_TYPES: dict[str, type[Shell]] = {
+    "en": ShellEn,
+}
+
+
 if TYPE_CHECKING:
     from fantasy_forge.player import Player
@@ -0,0 +1,138 @@
+"""World snapshots
+
+A snapshot is a compiled copy of a loaded world, so that the toml files don't
+have to be parsed and resolved again on every start.
+Each snapshot is keyed by a digest of the path, size and mtime of every source
+file of the world. If any of them changes, the snapshot is rebuilt.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import logging
+import os
+import pickle
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Any
+
+from xdg_base_dirs import xdg_cache_home
+
+from fantasy_forge.gateway import Gateway
+from fantasy_forge.messages import Messages
+
+logger = logging.getLogger(__name__)
+
+# bump this whenever the pickled layout of the entity classes changes
+SNAPSHOT_VERSION = 8
+SNAPSHOT_FOLDER: Path = xdg_cache_home() / "fantasy_forge" / "snapshots"
+
+
+def snapshot_path(world_name: str, world_path: Path) -> Path:
+    """Returns the path of the snapshot file for a world.
+
+    Worlds with the same name in different directories get different files.
+    """
+    path_hash = hashlib.sha256(str(world_path.resolve()).encode()).hexdigest()
+    return SNAPSHOT_FOLDER / f"{world_name}-{path_hash[:16]}.pickle"
+
+
+def source_digest(world_path: Path) -> str:
+    """Hashes path, size and mtime of every toml file of a world."""
+    digest = hashlib.sha256(f"{SNAPSHOT_VERSION}\n".encode())
+    for toml_path in sorted(world_path.glob("**/*.toml")):
+        stat = toml_path.stat()
+        relative = toml_path.relative_to(world_path).as_posix()
+        digest.update(f"{relative}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode())
+    return digest.hexdigest()
+
+
+class _SnapshotPickler(pickle.Pickler):
+    """Pickles a world's assets without its Messages object."""
+
+    def persistent_id(self, obj: Any) -> str | None:
+        if isinstance(obj, Messages):
+            return "messages"
+        return None
+
+
+class _SnapshotUnpickler(pickle.Unpickler):
+    """Reattaches the loading world's Messages object."""
+
+    def __init__(self, file: IO[bytes], messages: Messages):
+        super().__init__(file)
+        self.messages = messages
+
+    def persistent_load(self, pid: Any) -> Any:
+        if pid == "messages":
+            return self.messages
+        raise pickle.UnpicklingError(f"unknown persistent id {pid!r}")
+
+
+def dump_entities(obj: Any) -> bytes:
+    """Pickles entities without their Messages object, see load_entities."""
+    stream = io.BytesIO()
+    _SnapshotPickler(stream, pickle.HIGHEST_PROTOCOL).dump(obj)
+    return stream.getvalue()
+
+
+def load_entities(data: bytes, messages: Messages) -> Any:
+    """Unpickles entities for the world of messages."""
+    return _SnapshotUnpickler(io.BytesIO(data), messages).load()
+
+
+def save_snapshot(world: World) -> None:
+    """Writes a snapshot of a loaded and resolved world."""
+    path = snapshot_path(world.name, world.path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    digest = source_digest(world.path)
+
+    # write to a temporary file first, so a crash never leaves a broken snapshot
+    tmp_path = path.with_suffix(".tmp")
+    with tmp_path.open("wb") as stream:
+        stream.write(digest.encode() + b"\n")
+        _SnapshotPickler(stream, pickle.HIGHEST_PROTOCOL).dump(
+            {"areas": world.areas, "assets": dict(world.assets)}
+        )
+    os.replace(tmp_path, path)
+    logger.info("saved snapshot of %s to %s", world.name, path)
+
+
+def load_snapshot(world: World) -> bool:
+    """Fills a world from its snapshot.
+
+    Returns False if there is no valid snapshot, the world is left untouched then.
+    """
+    path = snapshot_path(world.name, world.path)
+    if not path.exists():
+        logger.info("no snapshot for %s", world.name)
+        return False
+    digest = source_digest(world.path)
+    with path.open("rb") as stream:
+        if stream.readline().rstrip(b"\n") != digest.encode():
+            logger.info("snapshot of %s is stale", world.name)
+            return False
+        try:
+            data = _SnapshotUnpickler(stream, world.messages).load()
+        except Exception:
+            logger.exception("could not read snapshot of %s", world.name)
+            return False
+
+    world.areas = data["areas"]
+    world.assets.update(data["assets"])
+
+    # gateways are pickled without their world, see Gateway.__getstate__
+    for area in world.areas.values():
+        world.key_registry.add_contents(area)
+        world.name_registry.add_contents(area)
+        for entity in area.contents.values():
+            if isinstance(entity, Gateway):
+                entity.world = world
+        world.area_graph.update(area)
+    world.spawn = world.areas[world.spawn_str]
+    logger.info("loaded snapshot of %s from %s", world.name, path)
+    return True
+
+
+if TYPE_CHECKING:
+    from fantasy_forge.world import World
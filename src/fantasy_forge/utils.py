@@ -1,9 +1,10 @@
 from __future__ import annotations
 
-import ctypes
 from pathlib import Path
 from string import whitespace
-from typing import TYPE_CHECKING, Any
+from typing import IO, TYPE_CHECKING, Any
+
+import toml
 
 from fantasy_forge.entity import Entity
 from fantasy_forge.messages import Messages
@@ -18,72 +19,80 @@ WORLDS_FOLDER: Path = DATA_FOLDER / "worlds"  # fantasy_forge/data/worlds
 # taken from https://stackoverflow.com/a/5948050/2192464
 class UniqueDict[K, V](dict[K, V]):
     def __setitem__(self, key: K, value: V):
-        if key not in self:
-            dict.__setitem__(self, key, value)
-        else:
+        if key in self:
+            raise KeyError("Key already exists")
+        # setdefault checks and inserts in one step, so of two threads adding
+        # different values at once, also without the GIL, one gets the KeyError
+        if dict.setdefault(self, key, value) is not value:
             raise KeyError("Key already exists")
 
 
-def inflate_contents(
-    messages: Messages, contents: list[dict[str, Any]], target: Area | Container
-):
-    contents_list: list[Entity] = []
-    for entity_dict in contents:
-        match entity_dict.get("kind", "entity"):
-            case "item":
-                from fantasy_forge.item import Item
+def inflate_entity(
+    messages: Messages, entity_dict: dict[str, Any], default_kind: str = "entity"
+) -> Entity:
+    """Creates an entity from its dictionary, the class is picked by 'kind'."""
+    match entity_dict.get("kind", default_kind):
+        case "item":
+            from fantasy_forge.item import Item
+
+            return Item(messages, entity_dict)
+        case "gateway":
+            from fantasy_forge.gateway import Gateway
 
-                contents_list.append(Item(messages, entity_dict))
-            case "gateway":
-                from fantasy_forge.gateway import Gateway
+            return Gateway(messages, entity_dict)
+        case "key":
+            from fantasy_forge.key import Key
 
-                contents_list.append(Gateway(messages, entity_dict))
-            case "key":
-                from fantasy_forge.key import Key
+            return Key(messages, entity_dict)
+        case "enemy":
+            from fantasy_forge.enemy import Enemy
 
-                contents_list.append(Key(messages, entity_dict))
-            case "enemy":
-                from fantasy_forge.enemy import Enemy
+            return Enemy(messages, entity_dict)
+        case "weapon":
+            from fantasy_forge.weapon import Weapon
 
-                contents_list.append(Enemy(messages, entity_dict))
-            case "weapon":
-                from fantasy_forge.weapon import Weapon
+            return Weapon(messages, entity_dict)
+        case "armour":
+            from fantasy_forge.armour import Armour
 
-                contents_list.append(Weapon(messages, entity_dict))
-            case "armour":
-                from fantasy_forge.armour import Armour
+            return Armour(messages, entity_dict)
 
-                contents_list.append(Armour(messages, entity_dict))
+        case "container":
+            from fantasy_forge.container import Container
 
-            case "container":
-                from fantasy_forge.container import Container
+            return Container(messages, entity_dict)
 
-                contents_list.append(Container(messages, entity_dict))
+        case _:
+            return Entity(messages, entity_dict)
 
-            case _:
-                contents_list.append(Entity(messages, entity_dict))
+
+def inflate_contents(
+    messages: Messages, contents: list[dict[str, Any]], target: Area | Container
+):
+    contents_list: list[Entity] = [
+        inflate_entity(messages, entity_dict) for entity_dict in contents
+    ]
     for entity in contents_list:
         target.contents[entity.name] = entity
 
 
-# taken from https://stackoverflow.com/a/15274929/2192464
-def terminate_thread(thread):
-    """Terminates a python thread from another thread.
+def find_world_path(name: str) -> Path:
+    """Returns the directory of a world, name can also be a path."""
+    world_path = WORLDS_FOLDER / name
+    if not world_path.exists():
+        world_path = Path(name)
+    return world_path
+
+
+def read_toml(toml_path: Path) -> dict:
+    """Reads a toml file.
 
-    :param thread: a threading.Thread instance
+    This is a module level function, so World._load_assets can run it in a
+    process pool.
     """
-    if not thread.is_alive():
-        return
-
-    exc = ctypes.py_object(SystemExit)
-    res = ctypes.pythonapi.PyThreadState_SetAsyncExc(ctypes.c_long(thread.ident), exc)
-    if res == 0:
-        raise ValueError("nonexistent thread id")
-    elif res > 1:
-        # """if it returns a number greater than one, you're in trouble,
-        # and you should call it again with exc=NULL to revert the effect"""
-        ctypes.pythonapi.PyThreadState_SetAsyncExc(thread.ident, None)
-        raise SystemError("PyThreadState_SetAsyncExc failed")
+    io: IO
+    with toml_path.open(encoding="utf-8") as io:
+        return toml.load(io)
 
 
 def clean_filename(filename: str) -> str:
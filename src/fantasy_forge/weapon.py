@@ -9,6 +9,8 @@ from fantasy_forge.messages import Messages
 class Weapon(Item):
     """A Weapon is an item, which can deal damage to players or NPCs."""
 
+    __slots__ = ("damage",)
+
     __important_attributes__ = ("name", "damage")
     __attributes__ = {**Item.__attributes__, "damage": int}
 
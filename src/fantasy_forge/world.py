@@ -1,14 +1,19 @@
 from __future__ import annotations
 
 import logging
+import os
 import toml
 
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Container, Optional, Self, TYPE_CHECKING
+from threading import Lock, RLock
+from typing import Container, Iterable, Optional, Self, TYPE_CHECKING
 from importlib import resources
 
+from fantasy_forge.archive import WorldArchive
 from fantasy_forge.area import Area
+from fantasy_forge.area_graph import AreaGraph
 from fantasy_forge.armour import Armour
 from fantasy_forge.character import Character
 from fantasy_forge.enemy import Enemy
@@ -16,12 +21,20 @@ from fantasy_forge.entity import Entity
 from fantasy_forge.gateway import Gateway
 from fantasy_forge.inventory import Inventory
 from fantasy_forge.item import Item
-from fantasy_forge.key import Key
-from fantasy_forge.localization import get_fluent_locale
+from fantasy_forge.key import Key, KeyRegistry, nested_contents
+from fantasy_forge.localization import available_locales, get_fluent_locale
 from fantasy_forge.player import Player
-from fantasy_forge.utils import WORLDS_FOLDER
+from fantasy_forge.prototype import PrototypeRegistry
+from fantasy_forge.shell import SHELL_TYPES
 from fantasy_forge.messages import Messages
-from fantasy_forge.utils import UniqueDict
+from fantasy_forge.name_registry import NameRegistry
+from fantasy_forge.snapshot import load_snapshot, save_snapshot
+from fantasy_forge.utils import (
+    UniqueDict,
+    find_world_path,
+    inflate_entity,
+    read_toml,
+)
 from fantasy_forge.weapon import Weapon
 
 
@@ -46,14 +59,28 @@ ASSET_TYPES: dict[str, type] = {
 class World:
     """A world contains many rooms. It's where the game happens."""
 
-    l10n: FluentLocalization
+    l10n: FluentLocalization  # in the language of the world
+    locale_path: Optional[Path]  # see get_fluent_locale
     areas: UniqueDict[str, Area]
     messages: Messages
     name: str
+    path: Path  # the directory of the world, unless it's an archive
     spawn_str: str  # area name to spawn in
     spawn: Optional[Area]
     intro_text: str
     assets: dict[str, list[ASSET_TYPE]]  # store of all loaded assets
+    key_registry: KeyRegistry  # where all keys in loaded areas are
+    name_registry: NameRegistry  # taken names of entities and players
+    area_graph: AreaGraph  # gateways between the areas loaded so far
+    lazy: bool  # areas are loaded on first use
+    max_areas: Optional[int]  # how many areas a lazy world keeps in memory
+    archive: Optional[WorldArchive]  # set if the world is loaded from an archive
+    validated: bool  # the world was checked by fantasy-forge-compile
+    prototypes: PrototypeRegistry  # entity prototypes from world.toml
+    _players: dict[str, Player]  # connected players by name
+    _loaded_names: dict[str, frozenset[str]]  # see _evict_areas
+    shard: Optional[ShardWorker]  # set if this process serves only some areas
+    actors: Optional[AreaActors]  # set if every area runs its own tasks
 
     def __init__(
         self: Self,
@@ -61,48 +88,109 @@ class World:
         name: str,
         spawn_str: str,
         intro_text: str,
+        lazy: bool = False,
+        max_areas: Optional[int] = None,
+        archive: Optional[WorldArchive] = None,
+        prototypes: Optional[PrototypeRegistry] = None,
+        locale_path: Optional[Path] = None,
+        path: Optional[Path] = None,
     ):
         self.l10n = l10n
+        self.locale_path = locale_path
         self.name = name
+        self.path = find_world_path(name) if path is None else path
         self.areas = UniqueDict()
         self.spawn_str = spawn_str
         self.spawn = None
         self.intro_text = intro_text
         self.messages = Messages(l10n)
-        
+
         self.assets = defaultdict(list)
-        self._load_assets()
-        
-        # populate areas dict
-        for area in self.assets["Area"]:
-            self.areas[area.name] = area
-        
+        self.key_registry = KeyRegistry()
+        self.name_registry = NameRegistry()
+        self.area_graph = AreaGraph()
+        self._players = {}
+        self._loaded_names = {}
+        self.shard = None
+        self.actors = None
+        self.lazy = lazy
+        self.max_areas = max_areas
+        self.archive = archive
+        self.validated = archive is not None and archive.validated
+        self._area_lock = RLock()
+        self._players_lock = Lock()
+        if prototypes is None:
+            prototypes = PrototypeRegistry()
+        self.prototypes = prototypes
+
     @staticmethod
-    def load(name: str) -> World:
+    def load(
+        name: str,
+        use_snapshot: bool = True,
+        parallel: bool = False,
+        lazy: bool = False,
+        max_areas: Optional[int] = None,
+    ) -> World:
+        """Loads a world by name or path.
+
+        If use_snapshot is set, the world is restored from its compiled snapshot
+        if the snapshot is still up to date, otherwise the snapshot is rebuilt.
+        If parallel is set, the asset files are parsed in a process pool.
+        If lazy is set, only the spawn area is loaded, the other areas are loaded
+        when a gateway needs them. At most max_areas areas are kept in memory then.
+        Lazy worlds don't use snapshots.
+        name can also be a world archive, see fantasy_forge.archive.
+        Archives are compiled already, so they don't use snapshots either.
+        """
         with resources.as_file(resources.files()) as resource_path:
             locale_path = resource_path / "l10n/{locale}"
-        path = Path("data/worlds") / name
-        if not path.exists():
-            logger.debug(f"Path {path} not found, using {name}")
-            path = Path(name)
-        with (path / "world.toml").open() as world_file:
-            world_toml = toml.load(world_file)
-            logger.debug("language")
-            logger.debug(world_toml["language"])
-            l10n = get_fluent_locale(locale_path)
-            world_spawn: str = world_toml["spawn"]
-            world = World(
-                l10n, world_toml["name"], world_spawn, world_toml["intro_text"],
-            )
+        path = find_world_path(name)
+        archive: Optional[WorldArchive] = None
+        if path.is_file():
+            archive = WorldArchive(path)
+            world_toml = archive.world
+        else:
+            with (path / "world.toml").open() as world_file:
+                world_toml = toml.load(world_file)
+        logger.debug("language")
+        logger.debug(world_toml["language"])
+        l10n = get_fluent_locale(locale_path, world_toml["language"])
+        world_spawn: str = world_toml["spawn"]
+        world = World(
+            l10n,
+            world_toml["name"],
+            world_spawn,
+            world_toml["intro_text"],
+            lazy=lazy,
+            max_areas=max_areas,
+            archive=archive,
+            prototypes=PrototypeRegistry(world_toml.get("prototypes")),
+            locale_path=locale_path,
+            path=path,
+        )
+        use_snapshot = use_snapshot and not lazy and archive is None
+        if use_snapshot and load_snapshot(world):
+            return world
+        world._load_assets(parallel=parallel)
         world.resolve()
+        if use_snapshot:
+            save_snapshot(world)
         return world
-            
-    def _load_assets(self):
-        world_path = WORLDS_FOLDER / self.name
+
+    def _load_assets(self, parallel: bool = False):
+        """Loads all assets of the world.
+
+        If parallel is set, the toml files are read and parsed in a process pool.
+        The assets are always created in the parent process in sorted path order.
+        """
+        if self.archive is not None:
+            self._load_archive_assets()
+            return
 
         # iterate through world dir
+        asset_files: list[tuple[type, Path]] = []
         toml_path: Path
-        for toml_path in world_path.glob("**/*.toml"):
+        for toml_path in sorted(self.path.glob("**/*.toml")):
             asset_type: type
             parent: str = toml_path.parent.name
 
@@ -113,34 +201,287 @@ class World:
                 logger.info("skipped %s", toml_path.name)
                 continue
 
-            # read toml
-            io: IO
-            with toml_path.open(encoding="utf-8") as io:
-                toml_data: dict = toml.load(io)
-
-            # parse asset from toml data
-            if hasattr(asset_type, "from_dict"):
-                asset = asset_type.from_dict(self.messages, toml_data)
-            else:
+            if not hasattr(asset_type, "from_dict"):
                 logger.info("skipped %s", toml_path.name)
                 continue
 
+            # lazy worlds load their areas in get_area
+            if self.lazy and asset_type is Area:
+                continue
+
+            asset_files.append((asset_type, toml_path))
+
+        # read toml
+        toml_paths = [toml_path for _, toml_path in asset_files]
+        toml_datas: Iterable[dict]
+        if parallel and len(toml_paths) > 1:
+            workers = os.process_cpu_count() or 1
+            with ProcessPoolExecutor(workers) as executor:
+                toml_datas = list(
+                    executor.map(
+                        read_toml,
+                        toml_paths,
+                        chunksize=len(toml_paths) // (workers * 4) + 1,
+                    )
+                )
+        else:
+            toml_datas = map(read_toml, toml_paths)
+
+        # parse assets from toml data
+        for (asset_type, toml_path), toml_data in zip(asset_files, toml_datas):
+            asset = self._asset_from_dict(asset_type, toml_data)
             self.assets[asset_type.__name__].append(asset)
 
+        # populate areas dict
+        for area in self.assets["Area"]:
+            self.areas[area.name] = area
+
+    def _load_archive_assets(self):
+        """Loads all assets from the world archive."""
+        for parent, asset_dict in self.archive.asset_dicts():
+            asset_type = ASSET_TYPES.get(parent)
+            if asset_type is None or not hasattr(asset_type, "from_dict"):
+                logger.info("skipped %s asset", parent)
+                continue
+            # lazy worlds load their areas in get_area
+            if self.lazy and asset_type is Area:
+                continue
+            asset = self._asset_from_dict(asset_type, asset_dict)
+            self.assets[asset_type.__name__].append(asset)
+
+        # populate areas dict
+        for area in self.assets["Area"]:
+            self.areas[area.name] = area
+
+    @property
+    def locales(self: Self) -> list[str]:
+        """Returns the locales players can choose from.
+
+        Those are the translations which also have a shell, see SHELL_TYPES.
+        """
+        if self.locale_path is None:
+            return list(self.l10n.locales[:1])
+        return [
+            locale
+            for locale in available_locales(self.locale_path)
+            if locale in SHELL_TYPES
+        ]
+
+    def l10n_for(self: Self, locale: Optional[str]) -> FluentLocalization:
+        """Returns the localization for a player's locale.
+
+        None is the language of the world. Raises KeyError for unknown locales.
+        """
+        if locale is None or locale == self.l10n.locales[0]:
+            return self.l10n
+        if locale not in self.locales:
+            raise KeyError(locale)
+        return get_fluent_locale(self.locale_path, locale)
+
+    def _asset_from_dict(self: Self, asset_type: type, asset_dict: dict) -> Entity:
+        """Creates an asset, after filling in the prototypes it references."""
+        return asset_type.from_dict(self.messages, self.prototypes.expand(asset_dict))
+
+    def create_entity(
+        self: Self, prototype: str, overrides: Optional[dict] = None
+    ) -> Entity:
+        """Creates a new instance of a prototype, e.g. to spawn an enemy.
+
+        Raises KeyError for unknown prototypes.
+        The entity still has to be put somewhere and resolved.
+        """
+        entity_dict = self.prototypes.instantiate(prototype, overrides)
+        return inflate_entity(self.messages, entity_dict)
+
     @property
     def players(self: Self) -> list[Player]:
-        players = []
-        for area in self.areas.values():
-            players += area.players
+        """Returns all connected players."""
+        return list(self._players.values())
+
+    def add_player(self: Self, player: Player):
+        """Registers a player who joined the game.
+
+        The name should be reserved in the name_registry before the player is
+        created, otherwise it's reserved here.
+        """
+        self.name_registry.reserve(player.name)
+        with self._players_lock:
+            self._players[player.name] = player
+
+    def remove_player(self: Self, player: Player):
+        """Forgets a player who left the game or died."""
+        with self._players_lock:
+            if self._players.get(player.name) is not player:
+                return
+            del self._players[player.name]
+        self.name_registry.release(player.name)
 
-        return players
+    def broadcast(self: Self, message_id: str, **parameters):
+        """Sends a message to all players, including those in other shards."""
+        self.messages.to(self.players, message_id, **parameters)
+        if self.shard is not None:
+            self.shard.broadcast(message_id, parameters)
 
     def resolve(self):
         for area in self.areas.values():
+            self.key_registry.add_contents(area)
+            self.name_registry.add_contents(area)
+        for area in self.areas.values():
+            for entity in area.contents.values():
+                entity.resolve(self)
+            self.area_graph.update(area)
+
+        self.spawn = self.get_area(self.spawn_str)
+
+    def get_area(self: Self, name: str) -> Area:
+        """Returns the area with that name.
+
+        In a lazy world the area is loaded from areas/<name>.toml (or the world
+        archive) if it isn't in memory yet.
+        Loading might evict other areas, see _evict_areas.
+        """
+        if not self.lazy:
+            return self.areas[name]
+        with self._area_lock:
+            area = self.areas.pop(name, None)
+            if area is not None:
+                # re-insert to mark the area as recently used
+                self.areas[name] = area
+                return area
+            if self.archive is not None:
+                area_dict = self.archive.area_dict(name)
+            else:
+                area_path = self.path / "areas" / f"{name}.toml"
+                try:
+                    area_dict = read_toml(area_path)
+                except FileNotFoundError:
+                    raise KeyError(name) from None
+            area = self._asset_from_dict(Area, area_dict)
+            logger.info("loaded area %s", name)
+            self.areas[name] = area
+            self._loaded_names[name] = nested_names(area)
+            self.key_registry.add_contents(area)
+            taken = self.name_registry.add_contents(area)
+            if taken:
+                # those players can't enter the area, see Player._arrive
+                logger.warning(
+                    "players named %s can't enter %s", ", ".join(sorted(taken)), name
+                )
             for entity in area.contents.values():
                 entity.resolve(self)
+            self.area_graph.update(area)
+            self._evict_areas(keep=area)
+            return area
+
+    def reload_area(self: Self, area_dict: dict) -> Optional[Area]:
+        """Swaps the contents of an area for freshly loaded ones.
+
+        The area object itself is kept, so gateways and players still point to it.
+        Players in the area stay there with their inventories, and so does
+        everything which isn't from the area file, like dropped items and loot.
+        Everything from the file is replaced. Areas which aren't loaded in a
+        lazy world are skipped, they get loaded from the new file anyway.
+        If the new file doesn't resolve, the world is left as it was.
+        """
+        new_area = self._asset_from_dict(Area, area_dict)
+        with self._area_lock:
+            area = self.areas.get(new_area.name)
+            if area is None and self.lazy:
+                return None
+            self._resolve_contents(new_area)
+            if area is None:
+                # a new area was added
+                self.areas[new_area.name] = new_area
+                self.name_registry.add_contents(new_area)
+                self.area_graph.update(new_area)
+                return new_area
+
+            contents = new_area.contents
+            file_names = nested_names(new_area)
+            players = area.players
+            for name, entity in list(area.contents.items()):
+                if isinstance(entity, Player):
+                    if name in contents:
+                        logger.warning(
+                            "%s in %s is shadowed by a player", name, area.name
+                        )
+                        del contents[name]
+                elif name in area.source_names:
+                    # replaced by the new file or removed from it
+                    continue
+                elif name in contents:
+                    logger.warning(
+                        "%s in %s is shadowed by the new file, dropping it",
+                        name,
+                        area.name,
+                    )
+                    continue
+                contents[name] = entity
+
+            self.key_registry.remove_contents(area)
+            area.description = new_area.description
+            area.obvious = new_area.obvious
+            area.contents = contents
+            area.source_names = new_area.source_names
+            if self.lazy:
+                # what's kept from before isn't in the file, see _evict_areas
+                self._loaded_names[area.name] = file_names
+            self.key_registry.add_contents(area)
+            self.name_registry.add_contents(area)
+            self.area_graph.update(area)
+
+            # players might still hold on to the old entities, their threads
+            # swap them before the next command
+            for player in players:
+                player.seen_outdated = True
+            return area
+
+    def _resolve_contents(self: Self, area: Area):
+        """Resolves the contents of an area which isn't in the world yet.
+
+        Its keys are registered, because locked gateways need them. If
+        resolving fails, they are removed again.
+        """
+        self.key_registry.add_contents(area)
+        try:
+            for entity in area.contents.values():
+                entity.resolve(self)
+        except BaseException:
+            self.key_registry.remove_contents(area)
+            raise
+
+    def _evict_areas(self: Self, keep: Area):
+        """Drops least recently used areas until max_areas is met.
+
+        Areas with players in them and the spawn are never evicted.
+        An evicted area is loaded from disk again on the next visit, so areas
+        where something was taken or left are kept, otherwise those entities
+        would come back twice or get lost. Other changes, like unlocked
+        gateways, are reset.
+        The area graph keeps the gateways of evicted areas for routing.
+        """
+        if self.max_areas is None:
+            return
+        for area in list(self.areas.values()):
+            if len(self.areas) <= self.max_areas:
+                break
+            if area is keep or area is self.spawn or area.players:
+                continue
+            if nested_names(area) != self._loaded_names.get(area.name):
+                continue
+            del self.areas[area.name]
+            del self._loaded_names[area.name]
+            self.key_registry.remove_contents(area)
+            logger.info("evicted area %s", area.name)
+
+
+def nested_names(area: Area) -> frozenset[str]:
+    """Returns the names of everything in an area, nested entities too."""
+    return frozenset(entity.name for entity, _ in nested_contents(area))
 
-        self.spawn = self.areas[self.spawn_str]
 
 if TYPE_CHECKING:
     from fluent.runtime import FluentLocalization
+
+    from fantasy_forge.area_actors import AreaActors
+    from fantasy_forge.sharding import ShardWorker
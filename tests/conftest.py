@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import sys
+from typing import Callable, Iterator
+
+import pytest
+
+from fantasy_forge.player import Player
+from fantasy_forge.world import World
+
+
+class NullOutput:
+    """stdout of a test player, the text isn't needed."""
+
+    def write(self, text: str):
+        pass
+
+    def flush(self):
+        pass
+
+
+@pytest.fixture
+def world() -> World:
+    return World.load("chaosdorf", use_snapshot=False)
+
+
+@pytest.fixture
+def lazy_world() -> World:
+    return World.load("chaosdorf", lazy=True)
+
+
+@pytest.fixture
+def new_player() -> Callable[[World, str], Player]:
+    """Returns a function which lets a new player enter a world."""
+
+    def new_player(world: World, name: str) -> Player:
+        player = Player(world, name, "a test player")
+        player.enter_game(stdout=NullOutput())
+        return player
+
+    return new_player
+
+
+@pytest.fixture
+def frequent_switches() -> Iterator[None]:
+    """Makes threads switch as often as possible, so races show up with the GIL."""
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import pickle
+from threading import Thread
+
+import pytest
+
+from fantasy_forge.area import AreaContents
+from fantasy_forge.entity import Entity
+from fantasy_forge.gateway import Gateway
+from fantasy_forge.item import Item
+from fantasy_forge.utils import UniqueDict
+
+
+def index_names(contents: AreaContents) -> dict[str, set[str]]:
+    return {kind: set(index) for kind, index in contents.by_kind.items()}
+
+
+@pytest.fixture
+def entities(world) -> dict[str, Entity]:
+    messages = world.messages
+    return {
+        "stone": Item(messages, {"name": "stone", "obvious": True}),
+        "gate": Gateway(messages, {"name": "gate", "target": "lounge"}),
+        "wall": Entity(messages, {"name": "wall"}),
+    }
+
+
+def test_indexes_follow_changes(entities):
+    contents = AreaContents()
+    contents.update(entities)
+    assert index_names(contents) == {
+        "players": set(),
+        "characters": set(),
+        "gateways": {"gate"},
+        "items": {"stone"},
+        "obvious": {"stone"},
+    }
+
+    del contents["gate"]
+    assert contents.by_kind["gateways"] == {}
+    assert contents.pop("stone") is entities["stone"]
+    assert contents.by_kind["items"] == {}
+    assert contents.by_kind["obvious"] == {}
+    assert contents.pop("stone", None) is None
+
+    contents.setdefault("stone", entities["stone"])
+    assert set(contents.by_kind["items"]) == {"stone"}
+    contents.clear()
+    assert all(not index for index in contents.by_kind.values())
+
+
+def test_in_place_or_updates_indexes(entities):
+    contents = AreaContents()
+    contents |= entities
+    assert set(contents.by_kind["gateways"]) == {"gate"}
+    assert set(contents.by_kind["items"]) == {"stone"}
+
+
+def test_pickle_rebuilds_indexes(entities):
+    contents = AreaContents()
+    contents.update(entities)
+    # Messages can't be pickled, the snapshot pickler leaves them out
+    for entity in contents.values():
+        entity.messages = None
+    copy = pickle.loads(pickle.dumps(contents))
+    assert index_names(copy) == index_names(contents)
+
+
+def test_unique_dict_rejects_other_values():
+    unique: UniqueDict[str, object] = UniqueDict()
+    value = object()
+    unique["key"] = value
+    with pytest.raises(KeyError):
+        unique["key"] = object()
+    # adding the same value twice is a bug as well
+    with pytest.raises(KeyError):
+        unique["key"] = value
+
+
+def test_only_one_thread_adds_a_key(frequent_switches):
+    unique: UniqueDict[str, int] = UniqueDict()
+    winners: list[int] = []
+
+    def add(number: int):
+        for round in range(200):
+            try:
+                unique[f"key{round}"] = number
+            except KeyError:
+                continue
+            winners.append(number)
+
+    threads = [Thread(target=add, args=(number,)) for number in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(winners) == 200
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import pickle
+from threading import Thread
+
+import pytest
+
+from fantasy_forge.inventory import Inventory, InventoryFull, InventoryTooSmall
+from fantasy_forge.item import Item
+
+
+def make_item(world, name: str, weight: int = 1) -> Item:
+    return Item(world.messages, {"name": name, "weight": weight})
+
+
+def test_weight_follows_contents(world):
+    inventory = Inventory(world.messages, 10)
+    inventory.add(make_item(world, "stone", 4))
+    inventory.add(make_item(world, "feather", 1))
+    assert inventory.content_weight == 5
+    assert inventory.pop("stone").name == "stone"
+    assert inventory.pop("stone") is None
+    assert inventory.content_weight == 1
+    assert [item.name for item in inventory.pop_all()] == ["feather"]
+    assert inventory.content_weight == 0
+
+
+def test_capacity(world):
+    inventory = Inventory(world.messages, 5)
+    with pytest.raises(InventoryTooSmall):
+        inventory.add(make_item(world, "boulder", 6))
+    inventory.add(make_item(world, "stone", 5))
+    with pytest.raises(InventoryFull):
+        inventory.add(make_item(world, "feather", 1))
+    inventory.check_weight()
+
+
+def test_pickle_leaves_out_the_lock(world):
+    inventory = Inventory(world.messages, 10)
+    inventory.add(make_item(world, "stone", 3))
+    inventory.messages = None
+    for item in inventory:
+        item.messages = None
+    copy = pickle.loads(pickle.dumps(inventory))
+    assert copy.content_weight == 3
+    copy.add(make_item(world, "feather", 1))
+    copy.check_weight()
+
+
+def test_weight_stays_right_in_threads(world, frequent_switches):
+    inventory = Inventory(world.messages, 1000)
+
+    def add_and_drop(number: int):
+        for round in range(100):
+            name = f"item{number}-{round}"
+            inventory.add(make_item(world, name, round % 3))
+            if round % 2:
+                inventory.pop(name)
+
+    threads = [Thread(target=add_and_drop, args=(number,)) for number in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    inventory.check_weight()
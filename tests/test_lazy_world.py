@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import pytest
+
+from fantasy_forge.item import Item
+from fantasy_forge.world import World
+
+
+@pytest.fixture
+def small_world() -> World:
+    """A lazy world which only keeps the spawn and one other area."""
+    return World.load("chaosdorf", lazy=True, max_areas=2)
+
+
+def test_unchanged_areas_are_evicted(small_world):
+    small_world.get_area("kitchen")
+    small_world.get_area("hackcenter")
+    assert set(small_world.areas) == {"cave", "hackcenter"}
+
+
+def test_areas_with_taken_items_are_kept(small_world):
+    kitchen = small_world.get_area("kitchen")
+    knife = kitchen.contents.pop("knife")
+    small_world.get_area("hackcenter")
+    assert small_world.get_area("kitchen") is kitchen
+    assert "knife" not in kitchen.contents
+    assert knife.name == "knife"
+
+
+def test_areas_with_dropped_items_are_kept(small_world):
+    kitchen = small_world.get_area("kitchen")
+    kitchen.contents["stone"] = Item(small_world.messages, {"name": "stone"})
+    small_world.get_area("hackcenter")
+    assert small_world.get_area("kitchen").contents["stone"].name == "stone"
+
+
+def test_areas_with_changed_containers_are_kept(small_world):
+    hackcenter = small_world.get_area("hackcenter")
+    hackcenter.contents["fridge"].contents.pop("mate")
+    small_world.get_area("kitchen")
+    assert small_world.get_area("hackcenter") is hackcenter
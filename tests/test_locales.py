@@ -0,0 +1,12 @@
+from __future__ import annotations
+
+import shutil
+
+
+def test_only_locales_with_a_shell_are_offered(world, tmp_path):
+    english = world.locale_path.parent / "en" / "main.ftl"
+    for locale in ["en", "xx"]:
+        (tmp_path / locale).mkdir()
+        shutil.copy(english, tmp_path / locale / "main.ftl")
+    world.locale_path = tmp_path / "{locale}"
+    assert world.locales == ["en"]
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from threading import Thread
+
+from fantasy_forge.key import Key, KeyRegistry
+from fantasy_forge.name_registry import NameRegistry
+
+
+def test_reserve_and_release():
+    registry = NameRegistry()
+    assert registry.reserve("alice")
+    assert not registry.reserve("alice")
+    assert "alice" in registry
+    registry.release("alice")
+    assert registry.reserve("alice")
+
+
+def test_only_one_login_gets_a_name(frequent_switches):
+    registry = NameRegistry()
+    results: list[bool] = []
+    threads = [
+        Thread(target=lambda: results.append(registry.reserve("alice")))
+        for _ in range(16)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results.count(True) == 1
+
+
+def test_entity_names_are_taken(world):
+    assert not world.name_registry.reserve("tv remote")
+    assert not world.name_registry.reserve("sofa")
+
+
+def test_lazy_world_takes_names_when_loading_areas(lazy_world, new_player):
+    assert "lounge" not in lazy_world.areas
+    # nothing is parsed up front, so the name is still free
+    player = new_player(lazy_world, "sofa")
+    lazy_world.get_area("lounge")
+    assert not lazy_world.name_registry.reserve("table")
+
+    player.shell.handle_line("look around")
+    player.shell.handle_line("pick up tv remote")
+    player.shell.handle_line("use tv remote with door")
+    player.shell.handle_line("go door")
+    assert player.area.name == "cave"
+    assert lazy_world.areas["lounge"].contents["sofa"] is not player
+
+
+def test_player_leaving_releases_name(world, new_player):
+    player = new_player(world, "alice")
+    assert not world.name_registry.reserve("alice")
+    player.leave_game()
+    assert world.name_registry.reserve("alice")
+
+
+def test_key_registry(world):
+    registry = KeyRegistry()
+    key = Key(world.messages, {"name": "key", "key_id": "door"})
+    spare = Key(world.messages, {"name": "spare key", "key_id": "door"})
+    cave = world.areas["cave"]
+    lounge = world.areas["lounge"]
+    registry.move(key, cave)
+    registry.move(spare, lounge)
+    assert "door" in registry
+    assert registry.find("door") == [key, spare]
+    assert registry.holder(key) is cave
+    registry.move(key, lounge)
+    assert registry.holder(key) is lounge
+    registry.remove(key)
+    registry.remove(spare)
+    assert "door" not in registry
+    assert len(registry) == 0
+
+
+def test_picked_up_keys_move(world, new_player):
+    player = new_player(world, "alice")
+    player.shell.handle_line("look around")
+    player.shell.handle_line("pick up tv remote")
+    (key,) = world.key_registry.find("opensesame")
+    assert world.key_registry.holder(key) is player.inventory
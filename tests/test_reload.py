@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import copy
+import os
+import shutil
+
+import pytest
+
+from fantasy_forge.hot_reload import AreaWatcher
+from fantasy_forge.item import Item
+from fantasy_forge.utils import find_world_path, read_toml
+from fantasy_forge.world import World
+
+
+@pytest.fixture
+def cave_dict(world) -> dict:
+    return read_toml(world.path / "areas" / "cave.toml")
+
+
+def test_reload_keeps_players_and_dropped_items(world, new_player, cave_dict):
+    player = new_player(world, "alice")
+    cave = world.areas["cave"]
+    loot = Item(world.messages, {"name": "loot"})
+    cave.contents["loot"] = loot
+    old_tv = cave.contents["tv"]
+
+    cave_dict["description"] = "a reloaded cave"
+    assert world.reload_area(copy.deepcopy(cave_dict)) is cave
+    assert cave.description == "a reloaded cave"
+    assert cave.contents["alice"] is player
+    assert cave.contents["loot"] is loot
+    assert cave.contents["tv"] is not old_tv
+
+
+def test_reload_removes_what_the_file_removed(world, cave_dict):
+    cave_dict["contents"] = [
+        entity for entity in cave_dict["contents"] if entity["name"] != "black hat"
+    ]
+    cave = world.reload_area(cave_dict)
+    assert "black hat" not in cave.contents
+
+
+def test_seen_entities_are_swapped_before_the_next_command(
+    world, new_player, cave_dict
+):
+    player = new_player(world, "alice")
+    player.shell.handle_line("look around")
+    world.reload_area(cave_dict)
+    assert player.seen_outdated
+    player.shell.handle_line("inventory")
+    assert not player.seen_outdated
+    assert player.seen_entities["tv"] is world.areas["cave"].contents["tv"]
+
+
+def test_failed_new_area_is_not_added(world):
+    area_dict = {
+        "name": "broken",
+        "description": "",
+        "contents": [{"kind": "gateway", "name": "hole", "target": "nowhere"}],
+    }
+    with pytest.raises(KeyError):
+        world.reload_area(area_dict)
+    assert "broken" not in world.areas
+
+
+def test_watcher_retries_failed_reloads(tmp_path):
+    world_path = tmp_path / "chaosdorf"
+    shutil.copytree(find_world_path("chaosdorf"), world_path)
+    world = World.load(str(world_path), use_snapshot=False)
+    watcher = AreaWatcher(world)
+    lounge_path = world_path / "areas" / "lounge.toml"
+    text = lounge_path.read_text()
+    description = world.areas["lounge"].description
+
+    # like an editor's half written save
+    lounge_path.write_text(text[: text.index("description =") + 15])
+    watcher.poll()
+    assert world.areas["lounge"].description == description
+
+    # the rest is written within the same mtime
+    mtime = lounge_path.stat().st_mtime_ns
+    lounge_path.write_text(text.replace(description, "a reloaded lounge"))
+    os.utime(lounge_path, ns=(mtime, mtime))
+    watcher.poll()
+    assert world.areas["lounge"].description == "a reloaded lounge"
@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import asyncio
+
+from fantasy_forge.async_server import run_session
+from fantasy_forge.session import SessionManager
+
+
+async def play_session(world, lines: list[str]) -> str:
+    """Plays lines on the asyncio server, returns everything it sent."""
+    sessions = SessionManager()
+
+    async def handle(reader, writer):
+        await run_session(world, sessions, reader, writer)
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write("".join(line + "\n" for line in lines).encode())
+    writer.write_eof()
+    output = await reader.read()
+    writer.close()
+    server.close()
+    await server.wait_closed()
+    return output.decode()
+
+
+def test_failing_command_keeps_the_session(world):
+    # the baseline's do_use can't unpack more than one "with"
+    output = asyncio.run(
+        play_session(world, ["bob", "", "use tv with door with tv", "look around"])
+    )
+    assert "tv remote" in output
+    assert world.players == []
+    assert "bob" not in world.spawn.contents
+    assert world.name_registry.reserve("bob")
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+
+from fantasy_forge.archive import pack_world
+from fantasy_forge.player import BASE_PLAYER_HEALTH
+from fantasy_forge.sharding import ShardWorker, shard_of
+from fantasy_forge.utils import find_world_path
+from fantasy_forge.world import World
+
+SHARDS = 5  # cave and lounge are in different shards then
+
+
+class FakeConnection:
+    """Collects what a worker sends to the front."""
+
+    def __init__(self):
+        self.sent: list[tuple[Any, ...]] = []
+
+    def send(self, message: tuple[Any, ...]):
+        self.sent.append(message)
+
+
+@pytest.fixture
+def archive_path(tmp_path):
+    path = tmp_path / "chaosdorf.ffworld"
+    pack_world(find_world_path("chaosdorf"), path)
+    return path
+
+
+def start_worker(archive_path, area_name: str) -> ShardWorker:
+    world = World.load(str(archive_path), lazy=True)
+    return ShardWorker(world, shard_of(area_name, SHARDS), SHARDS, FakeConnection())
+
+
+def test_hand_off_from_an_archive_world(archive_path):
+    assert shard_of("cave", SHARDS) != shard_of("lounge", SHARDS)
+    cave_worker = start_worker(archive_path, "cave")
+    state = {
+        "name": "alice",
+        "description": "a test player",
+        "health": BASE_PLAYER_HEALTH,
+        "locale": None,
+        "area": "cave",
+        "visited_areas": [],
+        "items": None,
+    }
+    cave_worker.join(0, state, False)
+    for line in ["look around", "pick up tv remote", "use tv remote with door"]:
+        cave_worker.handle_line(0, line)
+    cave_worker.handle_line(0, "go door")
+    handoffs = [message for message in cave_worker.conn.sent if message[0] == "handoff"]
+    assert len(handoffs) == 1
+    _, session_id, area_name, state = handoffs[0]
+    assert area_name == "lounge"
+    assert cave_worker.players == {}
+
+    lounge_worker = start_worker(archive_path, "lounge")
+    lounge_worker.join(session_id, state, False)
+    player = lounge_worker.players[session_id]
+    assert player.area.name == "lounge"
+    (remote,) = player.inventory
+    assert remote.name == "tv remote"
+    assert remote.description
+    assert lounge_worker.world.key_registry.holder(remote) is player.inventory
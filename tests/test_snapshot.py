@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+import shutil
+
+from fantasy_forge import snapshot
+from fantasy_forge.snapshot import load_snapshot
+from fantasy_forge.utils import find_world_path
+from fantasy_forge.world import World
+
+
+def test_worlds_with_the_same_name_get_their_own_snapshots(tmp_path, monkeypatch):
+    monkeypatch.setattr(snapshot, "SNAPSHOT_FOLDER", tmp_path / "snapshots")
+    world_paths = [tmp_path / "a" / "chaosdorf", tmp_path / "b" / "chaosdorf"]
+    for world_path in world_paths:
+        shutil.copytree(find_world_path("chaosdorf"), world_path)
+        World.load(str(world_path))
+    assert len(list((tmp_path / "snapshots").glob("*.pickle"))) == 2
+
+    for world_path in world_paths:
+        world = World.load(str(world_path), use_snapshot=False)
+        assert load_snapshot(world)
@@ -0,0 +1,126 @@
+"""Many players playing one world at once, each in its own thread.
+
+On a free-threaded interpreter (python3.13t) they really run in parallel,
+with the GIL the switch interval is lowered to provoke races. Afterwards
+the world has to be consistent: every entity is in exactly one place and
+nothing got lost, the indexes of all areas match their contents, the weights
+add up and the key registry knows where every key is.
+"""
+
+from __future__ import annotations
+
+import random
+from threading import Thread
+
+import pytest
+
+from fantasy_forge.area import AreaContents
+from fantasy_forge.area_actors import AreaActors
+from fantasy_forge.container import Container
+from fantasy_forge.gateway import Gateway
+from fantasy_forge.item import Item
+from fantasy_forge.key import Key, nested_contents
+from fantasy_forge.player import Player
+from fantasy_forge.world import World
+
+PLAYERS = 8
+COMMANDS = 200
+
+
+def next_command(player: Player, rng: random.Random) -> str:
+    """Picks a random command which makes sense for what the player has seen."""
+    commands = ["look around"]
+    gateways: list[Gateway] = []
+    for entity in list(player.seen_entities.values()):
+        if isinstance(entity, Gateway):
+            gateways.append(entity)
+            commands.append(f"go {entity.name}")
+        elif isinstance(entity, Item) and entity.carryable:
+            if entity.name not in player.inventory:
+                commands.append(f"pick up {entity.name}")
+    for item in player.inventory:
+        commands.append(f"drop {item.name}")
+        if isinstance(item, Key):
+            commands.extend(f"use {item.name} with {gate.name}" for gate in gateways)
+    return rng.choice(commands)
+
+
+def play(player: Player, seed: int, errors: list[BaseException]):
+    """Plays random commands, exceptions are collected in errors."""
+    rng = random.Random(seed)
+    world = player.world
+    try:
+        for _ in range(COMMANDS):
+            command = next_command(player, rng)
+            if world.actors is None:
+                stop = player.shell.handle_line(command)
+            else:
+                area_name = player.area.name
+                stop = world.actors.run(area_name, player.shell.handle_line, command)
+            if stop:
+                break
+        player.leave_game()
+    except BaseException as error:
+        errors.append(error)
+
+
+def entity_places(world: World) -> dict[int, list[str]]:
+    """Returns where each entity is, by id."""
+    places: dict[int, list[str]] = {}
+    for area in world.areas.values():
+        for entity, holder in nested_contents(area):
+            # the inventories of characters have no name
+            place = getattr(holder, "name", "an inventory")
+            places.setdefault(id(entity), []).append(place)
+    return places
+
+
+def check_world(world: World, before: set[int]) -> list[str]:
+    """Returns the inconsistencies in the world.
+
+    before are the ids of the entities right after loading.
+    """
+    problems = []
+    places = entity_places(world)
+    for entity_id, holders in places.items():
+        if len(holders) > 1:
+            problems.append(f"entity {entity_id} is in {', '.join(holders)}")
+    lost = before - places.keys()
+    if lost:
+        problems.append(f"{len(lost)} entities got lost")
+    for area in world.areas.values():
+        fresh = AreaContents()
+        fresh.update(area.contents)
+        if fresh.by_kind != area.contents.by_kind:
+            problems.append(f"the indexes of {area.name} don't match its contents")
+        for entity, holder in nested_contents(area):
+            if isinstance(entity, Container):
+                if entity.content_weight != entity.calculate_weight():
+                    problems.append(f"the weight of {entity.name} is wrong")
+            if isinstance(entity, Key):
+                if world.key_registry.holder(entity) is not holder:
+                    problems.append(f"the key registry lost {entity.name}")
+    return problems
+
+
+@pytest.mark.parametrize("area_actors", [False, True])
+def test_players_in_parallel(world, new_player, frequent_switches, area_actors):
+    before = set(entity_places(world))
+    if area_actors:
+        world.actors = AreaActors()
+    players = [new_player(world, f"player{n}") for n in range(PLAYERS)]
+    errors: list[BaseException] = []
+    threads = [
+        Thread(target=play, args=(player, seed, errors))
+        for seed, player in enumerate(players)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if world.actors is not None:
+        world.actors.shutdown()
+
+    assert errors == []
+    assert world.players == []
+    assert check_world(world, before) == []